@@ -0,0 +1,70 @@
+# Peak RSS of the duplicate index vs. the plain dict it replaced, the index alone; for the
+# whole engine's peak RSS during a scan use run.py (--memory-budget).
+# Usage: python benchmarks/index_memory.py [--entries 1000000 10000000] [--kinds dict index spill]
+# Every case runs in its own process so peak RSS is not shared between them.
+import os
+import sys
+import time
+import hashlib
+import argparse
+import resource
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SPILL_BUDGET = 256 * 1024 * 1024
+FILES_PER_FOLDER = 100
+
+def fake_file(i):
+    # A plausible archive path, a SHA256 digest and a full os.stat_result
+    path = f"/srv/archive/{i // 100000:03d}/{i // FILES_PER_FOLDER:07d}/IMG_{i:08d}.jpg"
+    digest = hashlib.sha256(i.to_bytes(8, "little")).hexdigest()
+    st = os.stat_result((0o100644, 1000000 + i, 2049, 1, 1000, 1000, 3000000 + i,
+                         1700000000, 1700000000, 1700000000,
+                         1700000000.0, 1700000000.0, 1700000000.0,
+                         1700000000 * 10 ** 9, 1700000000 * 10 ** 9 + i, 1700000000 * 10 ** 9))
+    return path, digest, st
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_case(kind, entries):
+    from mirrorclean.index import DuplicateIndex
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if kind == "dict":
+        index = {}
+        for i in range(entries):
+            path, digest, st = fake_file(i)
+            index[digest] = (path, st)
+        lookups = sum(1 for i in range(0, entries, 97) if fake_file(i)[1] in index)
+    else:
+        tmp = tempfile.mkdtemp()
+        index = DuplicateIndex(os.path.join(tmp, "index.db"), SPILL_BUDGET if kind == "spill" else 2 ** 62)
+        for i in range(entries):
+            path, digest, st = fake_file(i)
+            index.put(digest, path, st)
+        lookups = sum(1 for i in range(0, entries, 97) if index.get(fake_file(i)[1]))
+        index.close()
+    print(f"{kind:6} {entries:>11,} entries  peak RSS {peak_rss_mb() - baseline:8.0f} MB  "
+          f"{time.perf_counter() - started:6.1f} s  ({lookups:,} lookups)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000000, 10000000])
+    parser.add_argument("--kinds", nargs="+", choices=("dict", "index", "spill"),
+                        default=["dict", "index", "spill"])
+    parser.add_argument("--case", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        run_case(args.case[0], int(args.case[1]))
+        return
+    for entries in args.entries:
+        for kind in args.kinds:
+            result = subprocess.run([sys.executable, __file__, "--case", kind, str(entries)])
+            if result.returncode:
+                print(f"{kind:6} {entries:>11,} entries  failed (exit {result.returncode}, out of memory?)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# Headless benchmark suite: walk, hash and full scan/dedupe runs on a synthetic tree.
+# Usage: python benchmarks/run.py [--workdir /dev/shm/mc-bench] [--files 10000 ...tree options]
+#        [--cases walk hash scan rescan compare dedupe] [--repeat 3] [--output results.json]
+#        [--baseline baseline.json] [--threshold 10]
+# The tree (see tree.py) is generated once per workdir and reused while its options match.
+# Every case runs in its own process and reports the best of --repeat runs, so peak RSS is
+# the whole engine's per case (--memory-budget MB caps its stage tables and index); scan cases
+# also report the engine's time per stage. With --baseline, cases more than --threshold percent slower fail the run (exit 1).
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from tree import add_tree_arguments, tree_options, generate_tree, load_tree_info
+
+CASES = ("walk", "hash", "scan", "rescan", "compare", "dedupe")
+RESULTS_VERSION = 1
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def drop_caches():
+    # Cold reads need root on Linux; returns False when the page cache cannot be dropped
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+# --- Cases ---
+def run_walk(tree, args, work):
+    from mirrorclean.scanner import scan_directory
+    return {"files": sum(1 for _ in scan_directory(tree)), "bytes": 0}
+
+def run_hash(tree, args, work):
+    from mirrorclean.hashing import get_file_hash, get_hash_algorithm
+    from mirrorclean.scanner import scan_directory
+    hash_func = get_hash_algorithm(args.algorithm)
+    files, total = 0, 0
+    for path, st in scan_directory(tree):
+        get_file_hash(path, hash_func, args.read_mode)
+        files += 1
+        total += st.st_size
+    return {"files": files, "bytes": total}
+
+def scan_tree(tree, args, work, **options):
+    from mirrorclean.engine import remove_duplicate_files
+    from mirrorclean.hashing import get_hash_algorithm
+    from mirrorclean.metrics import RunMetrics
+    metrics = RunMetrics()
+    if args.memory_budget is not None:
+        options["memory_budget"] = args.memory_budget * 1024 * 1024
+    duplicates, skipped = remove_duplicate_files(
+        tree, os.path.join(work, "backup"), os.path.join(work, "logs"),
+        get_hash_algorithm(args.algorithm), False,
+        workers=args.workers,
+        read_mode=args.read_mode,
+        checkpoints=False,
+        metrics=metrics,
+        **options
+    )
+    # Engine time per stage (see mirrorclean.metrics) and its counters
+    snapshot = metrics.snapshot()
+    return {"duplicates": duplicates, "skipped": skipped, "stages": snapshot["seconds"],
+            "counters": snapshot["counters"]}
+
+def run_scan(tree, args, work):
+    return scan_tree(tree, args, work, dry_run=True, use_cache=False)
+
+def run_compare(tree, args, work):
+    return scan_tree(tree, args, work, dry_run=True, use_cache=False, compare_mode="compare")
+
+def run_rescan(tree, args, work):
+    # The untimed warm-up run in prepare() fills the hash cache
+    return scan_tree(tree, args, work, dry_run=True, use_cache=True)
+
+def run_dedupe(tree, args, work):
+    # Acts on a private copy of the tree, made before timing starts
+    return scan_tree(os.path.join(work, "tree"), args, work, use_cache=False, action=args.action)
+
+RUNNERS = {"walk": run_walk, "hash": run_hash, "scan": run_scan, "rescan": run_rescan,
+           "compare": run_compare, "dedupe": run_dedupe}
+
+def prepare(case, tree, args, work):
+    if os.path.exists(work):
+        shutil.rmtree(work)
+    os.makedirs(work)
+    if case == "rescan":
+        scan_tree(tree, args, work, dry_run=True, use_cache=True)
+    elif case == "dedupe":
+        shutil.copytree(tree, os.path.join(work, "tree"))
+
+def run_case(case, tree, args):
+    info = load_tree_info(tree)
+    work = os.path.join(args.workdir, f"work-{case}")
+    runs = []
+    for _ in range(args.repeat):
+        prepare(case, tree, args, work)
+        cold = drop_caches() if args.drop_caches else False
+        started = time.perf_counter()
+        result = RUNNERS[case](tree, args, work)
+        if "files" not in result:
+            result.update(files=info["files"], bytes=info["bytes"])
+        result["seconds"] = time.perf_counter() - started
+        result["cold"] = cold
+        runs.append(result)
+    shutil.rmtree(work, ignore_errors=True)
+    best = min(runs, key=lambda run: run["seconds"])
+    best["runs"] = [round(run["seconds"], 4) for run in runs]
+    best["files_per_sec"] = best["files"] / best["seconds"]
+    best["mb_per_sec"] = best["bytes"] / (1024 * 1024) / best["seconds"]
+    best["peak_rss_mb"] = peak_rss_mb()
+    if "duplicates" in best:
+        best["correct"] = best["duplicates"] == info["expected_duplicates"]
+    return best
+
+# --- Baselines ---
+def compare_results(results, baseline, threshold):
+    # Prints the change per case and returns the cases that got slower than threshold percent
+    regressions = []
+    if baseline.get("tree") != results["tree"]:
+        print("warning: the baseline was measured on a different tree", file=sys.stderr)
+    print(f"\n{'case':10} {'baseline s':>11} {'current s':>10} {'change':>8}")
+    for case, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(case)
+        if not previous:
+            print(f"{case:10} {'-':>11} {current['seconds']:10.3f}")
+            continue
+        change = (current["seconds"] / previous["seconds"] - 1) * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(case)
+            flag = "  slower"
+        print(f"{case:10} {previous['seconds']:11.3f} {current['seconds']:10.3f} {change:+7.1f}%{flag}")
+    return regressions
+
+def print_results(results):
+    print(f"{'case':10} {'seconds':>9} {'files/s':>10} {'MB/s':>9} {'peak RSS':>9}  check")
+    for case, result in results["cases"].items():
+        check = "" if "correct" not in result else ("ok" if result["correct"] else
+                                                     f"found {result['duplicates']} duplicates")
+        print(f"{case:10} {result['seconds']:9.3f} {result['files_per_sec']:10,.0f} "
+              f"{result['mb_per_sec']:9.1f} {result['peak_rss_mb']:7.0f} MB  {check}")
+        if "stages" in result:
+            stages = ", ".join(f"{name} {seconds:.3f}" for name, seconds in result["stages"].items() if seconds)
+            print(f"{'':10} stages: {stages}")
+
+def main():
+    parser = argparse.ArgumentParser(description="MirrorClean benchmark suite")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "mirrorclean-bench"),
+                        help="where the tree and scratch copies go (a tmpfs such as /dev/shm avoids disk noise)")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--algorithm", default="sha256")
+    parser.add_argument("--read-mode", default="readinto")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--action", default="hardlink", help="action of the dedupe case")
+    parser.add_argument("--memory-budget", type=int, metavar="MB",
+                        help="memory for the engine's stage tables and index before they move to disk")
+    parser.add_argument("--drop-caches", action="store_true",
+                        help="drop the page cache before every run (Linux, needs root)")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent slower that fails")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    add_tree_arguments(parser)
+    args = parser.parse_args()
+
+    tree = os.path.join(args.workdir, "tree")
+    if args.case:
+        json.dump(run_case(args.case, tree, args), sys.stdout)
+        return 0
+
+    options = tree_options(args)
+    try:
+        reuse = load_tree_info(tree)["params"] == options
+    except OSError:
+        reuse = False
+    if not reuse:
+        shutil.rmtree(tree, ignore_errors=True)
+        print(f"Generating {args.files:,} files in {tree}...", file=sys.stderr)
+        generate_tree(tree, **options)
+    info = load_tree_info(tree)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "tree": info,
+        "settings": {"algorithm": args.algorithm, "read_mode": args.read_mode, "workers": args.workers,
+                     "action": args.action, "repeat": args.repeat, "drop_caches": args.drop_caches,
+                     "memory_budget": args.memory_budget},
+        "cases": {}
+    }
+    for case in args.cases:
+        command = [sys.executable, os.path.abspath(__file__), "--case", case] + sys.argv[1:]
+        completed = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+        if completed.returncode:
+            print(f"{case}: failed (exit {completed.returncode})", file=sys.stderr)
+            continue
+        results["cases"][case] = json.loads(completed.stdout)
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) more than {args.threshold:g}% slower: "
+                  f"{', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# Synthetic trees for the benchmarks. The same arguments and seed always give the same tree.
+# Usage: python benchmarks/tree.py DIR [--files 10000] [--min-size 1K] [--max-size 4M]
+#        [--dup-ratio 0.3] [--near-ratio 0.05] [--depth 3] [--fanout 8] [--seed 1]
+# Sizes are log-uniform between --min-size and --max-size. --dup-ratio of the files are exact
+# copies of an earlier file, --near-ratio are copies with only the last byte changed (same size
+# and head, so only the tail sample tells them apart), the rest are distinct.
+import os
+import sys
+import json
+import math
+import random
+import argparse
+
+TREE_INFO_FILE = "tree.json"
+POOL_SIZE = 8 * 1024 * 1024
+UNIQUE_HEADER = 16
+
+def parse_size(value):
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+def folder_for(rng, depth, fanout):
+    # A path of up to depth levels, each one of fanout names
+    levels = rng.randint(1, depth) if depth else 0
+    return os.path.join(*[f"d{rng.randrange(fanout):02d}" for _ in range(levels)]) if levels else ""
+
+def distinct_content(pool, rng, size, serial):
+    # A unique header followed by a slice of the random pool, wrapping around for large files
+    header = serial.to_bytes(UNIQUE_HEADER, "little")[:size]
+    body_size = size - len(header)
+    offset = rng.randrange(POOL_SIZE)
+    parts = [header]
+    while body_size > 0:
+        chunk = pool[offset:offset + body_size]
+        parts.append(chunk)
+        body_size -= len(chunk)
+        offset = 0
+    return b"".join(parts)
+
+def generate_tree(directory, files=10000, min_size=1024, max_size=4 * 1024 * 1024, dup_ratio=0.3,
+                  near_ratio=0.05, depth=3, fanout=8, seed=1):
+    # Writes the tree and TREE_INFO_FILE next to it; returns the tree info
+    rng = random.Random(seed)
+    pool = rng.randbytes(POOL_SIZE)
+    os.makedirs(directory, exist_ok=True)
+    originals = []  # (path, size) of distinct files, to copy from
+    near_used = set()
+    counts = {"distinct": 0, "duplicates": 0, "near": 0}
+    total_bytes = 0
+    for serial in range(files):
+        kind = rng.random()
+        if originals and kind < dup_ratio:
+            source, size = rng.choice(originals)
+            with open(source, "rb") as f:
+                content = f.read()
+            counts["duplicates"] += 1
+        elif kind < dup_ratio + near_ratio and len(near_used) < len(originals):
+            # Each original gets at most one near copy, or two of them would be duplicates
+            source, size = rng.choice(originals)
+            while source in near_used:
+                source, size = rng.choice(originals)
+            near_used.add(source)
+            with open(source, "rb") as f:
+                content = bytearray(f.read())
+            content[-1] ^= 0xFF
+            counts["near"] += 1
+        else:
+            size = int(math.exp(rng.uniform(math.log(max(min_size, 1)), math.log(max(max_size, 1)))))
+            content = distinct_content(pool, rng, size, serial)
+            counts["distinct"] += 1
+        folder = os.path.join(directory, folder_for(rng, depth, fanout))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"file_{serial:07d}.bin")
+        with open(path, "wb") as f:
+            f.write(content)
+        total_bytes += len(content)
+        if counts["distinct"] > len(originals):
+            originals.append((path, len(content)))
+    info = {
+        "params": {"files": files, "min_size": min_size, "max_size": max_size, "dup_ratio": dup_ratio,
+                   "near_ratio": near_ratio, "depth": depth, "fanout": fanout, "seed": seed},
+        "files": files,
+        "bytes": total_bytes,
+        "expected_duplicates": counts["duplicates"],
+        "near_identical": counts["near"],
+        "distinct": counts["distinct"]
+    }
+    with open(tree_info_path(directory), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=1)
+    return info
+
+def tree_info_path(directory):
+    # Kept next to the tree, not inside it, so scans never see it
+    return directory.rstrip(os.sep) + "." + TREE_INFO_FILE
+
+def load_tree_info(directory):
+    with open(tree_info_path(directory), encoding="utf-8") as f:
+        return json.load(f)
+
+def add_tree_arguments(parser):
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--min-size", type=parse_size, default=1024)
+    parser.add_argument("--max-size", type=parse_size, default=4 * 1024 * 1024)
+    parser.add_argument("--dup-ratio", type=float, default=0.3, help="share of exact copies")
+    parser.add_argument("--near-ratio", type=float, default=0.05,
+                        help="share of copies that differ only in the last byte")
+    parser.add_argument("--depth", type=int, default=3, help="deepest folder level")
+    parser.add_argument("--fanout", type=int, default=8, help="folders per level")
+    parser.add_argument("--seed", type=int, default=1)
+
+def tree_options(args):
+    return {"files": args.files, "min_size": args.min_size, "max_size": args.max_size,
+            "dup_ratio": args.dup_ratio, "near_ratio": args.near_ratio, "depth": args.depth,
+            "fanout": args.fanout, "seed": args.seed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic tree for the benchmarks")
+    parser.add_argument("directory")
+    add_tree_arguments(parser)
+    args = parser.parse_args()
+    info = generate_tree(args.directory, **tree_options(args))
+    json.dump(info, sys.stdout, indent=1)
+    sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# Headless duplicate-finding engine. The Tk front-end lives in mirrorclean.gui and is only
+# imported when the desktop app is started.
+from .hashing import (
+    HASH_ALGORITHMS, PARTIAL_HASH_SETTINGS, READ_MODES, cancel_event,
+    register_hash_algorithm, get_hash_algorithm, blake2b_hasher, get_file_hash, get_partial_hash
+)
+from .cache import HashCache, compact_hash_cache
+from .actions import ACTION_MODES
+from .scanner import ScanRules, scan_directory
+from .index import DuplicateIndex
+from .engine import remove_duplicate_files
+from .plan import create_plan, apply_plan, read_plan
+from .store import BackupStore, restore_backup
+from .watch import watch_folders
+from .manifest import export_manifest, merge_manifests
+
+__all__ = [
+    "HASH_ALGORITHMS", "PARTIAL_HASH_SETTINGS", "READ_MODES", "ACTION_MODES", "cancel_event",
+    "register_hash_algorithm", "get_hash_algorithm", "blake2b_hasher", "get_file_hash",
+    "get_partial_hash", "HashCache", "compact_hash_cache", "ScanRules", "scan_directory", "DuplicateIndex", "remove_duplicate_files",
+    "create_plan", "apply_plan", "read_plan", "BackupStore", "restore_backup",
+    "watch_folders", "export_manifest", "merge_manifests"
+]
@@ -0,0 +1,109 @@
+import os
+import shutil
+import errno
+
+try:
+    import fcntl  # not available on Windows - reflinks are disabled there
+except ImportError:
+    fcntl = None
+
+# What happens to a duplicate:
+#   copy     - copy to the backup folder, then delete (works everywhere)
+#   move     - os.replace into the backup folder when on the same device, else copy
+#   hardlink - replace the duplicate with a hardlink to the kept file, no backup
+#   reflink  - replace the duplicate with a copy-on-write clone (btrfs/XFS), no backup
+#   store    - keep one blob per distinct content in the backup folder's store, then delete
+ACTION_MODES = ("copy", "move", "hardlink", "reflink", "store")
+DEFAULT_ACTION = "move"
+FICLONE = 0x40049409  # from linux/fs.h
+
+# --- Duplicate actions ---
+class ReflinkUnsupported(OSError):
+    pass
+
+def get_backup_path(path, directory, backup_dir, preserve_structure):
+    root, fname = os.path.split(path)
+    if preserve_structure:
+        rel_path = os.path.relpath(root, directory)
+        dest_dir = os.path.join(backup_dir, rel_path)
+        os.makedirs(dest_dir, exist_ok=True)
+        return os.path.join(dest_dir, fname)
+    base, ext = os.path.splitext(fname)
+    backup_path = os.path.join(backup_dir, fname)
+    i = 1
+    while os.path.exists(backup_path):
+        backup_path = os.path.join(backup_dir, f"{base}_{i}{ext}")
+        i += 1
+    return backup_path
+
+def copy_to_backup(path, backup_path):
+    shutil.copy2(path, backup_path)
+    os.remove(path)
+
+def move_to_backup(path, backup_path):
+    # A rename is a metadata-only operation, but only within one filesystem
+    if os.stat(path).st_dev == os.stat(os.path.dirname(backup_path)).st_dev:
+        os.replace(path, backup_path)
+    else:
+        copy_to_backup(path, backup_path)
+
+def _temp_sibling(path):
+    root, fname = os.path.split(path)
+    return os.path.join(root, f".{fname}.{os.getpid()}.mirrorclean-tmp")
+
+def replace_with_hardlink(path, kept_path):
+    # Link under a temporary name first so the duplicate is swapped atomically
+    tmp_path = _temp_sibling(path)
+    os.link(kept_path, tmp_path)
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def replace_with_reflink(path, kept_path):
+    if fcntl is None:
+        raise ReflinkUnsupported(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    tmp_path = _temp_sibling(path)
+    try:
+        with open(kept_path, "rb") as src, open(tmp_path, "xb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError as e:
+                if e.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+                    raise ReflinkUnsupported(e.errno, "filesystem does not support reflinks") from e
+                raise
+        shutil.copystat(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def apply_action(action, path, kept_path, directory, backup_dir, preserve_structure, digest=None,
+                 store=None):
+    # Returns where the duplicate's data went: its backup path or blob, or the kept file it now
+    # links to. store is the BackupStore for the store action.
+    if action == "store":
+        return store.put(path, digest)
+    if action == "hardlink":
+        replace_with_hardlink(path, kept_path)
+        return kept_path
+    if action == "reflink":
+        replace_with_reflink(path, kept_path)
+        return kept_path
+    backup_path = get_backup_path(path, directory, backup_dir, preserve_structure)
+    if action == "move":
+        move_to_backup(path, backup_path)
+    else:
+        copy_to_backup(path, backup_path)
+    return backup_path
+
+def describe_action(action, path, destination):
+    if action == "hardlink":
+        return f"Duplicate hardlinked: {path} → {destination}"
+    if action == "reflink":
+        return f"Duplicate reflinked: {path} → {destination}"
+    if action == "store":
+        return f"Duplicate removed: {path} → Stored: {destination}"
+    return f"Duplicate removed: {path} → Backup: {destination}"
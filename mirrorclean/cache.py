@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import time
+
+# Persistent hash cache - lives in the logs folder and is reused across runs
+HASH_CACHE_FILE = "hash_cache.db"
+HASH_CACHE_MAX_AGE_DAYS = 30
+HASH_CACHE_BATCH = 1000  # writes and last-seen updates committed together
+
+# --- Persistent hash cache ---
+class HashCache:
+    # Digests keyed by (st_dev, st_ino); size and mtime_ns must still match for a hit.
+    # Paths are stored as os.fsencode() bytes, so names that are not valid UTF-8 fit too.
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS digests (
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                algorithm TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                path BLOB NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (dev, ino, algorithm, kind)
+            )""")
+        self.hits, self.misses = 0, 0
+        self.pending = 0
+        self.seen = []
+        self.started = time.time()
+
+    def get(self, st, algorithm, kind):
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, digest FROM digests WHERE dev=? AND ino=? AND algorithm=? AND kind=?",
+            (st.st_dev, st.st_ino, algorithm, kind)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            self.hits += 1
+            self.seen.append((st.st_dev, st.st_ino, algorithm, kind))
+            if len(self.seen) >= HASH_CACHE_BATCH:
+                self.flush()
+            return row[2]
+        # Missing or stale - the caller rehashes and put() overwrites the old entry
+        self.misses += 1
+        return None
+
+    def put(self, path, st, algorithm, kind, digest):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (st.st_dev, st.st_ino, algorithm, kind, st.st_size, st.st_mtime_ns, digest, os.fsencode(path), self.started))
+        self.pending += 1
+        if self.pending >= HASH_CACHE_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self.seen:
+            self.conn.executemany(
+                "UPDATE digests SET last_seen=? WHERE dev=? AND ino=? AND algorithm=? AND kind=?",
+                [(self.started,) + key for key in self.seen])
+            self.seen = []
+        self.conn.commit()
+        self.pending = 0
+
+    def compact(self, max_age_days=HASH_CACHE_MAX_AGE_DAYS):
+        # Evict entries not seen recently or whose file is gone/changed, then reclaim space
+        cutoff = time.time() - max_age_days * 86400
+        removed = self.conn.execute("DELETE FROM digests WHERE last_seen < ?", (cutoff,)).rowcount
+        stale = []
+        for rowid, path, dev, ino, size, mtime_ns in self.conn.execute(
+                "SELECT rowid, path, dev, ino, size, mtime_ns FROM digests"):
+            try:
+                # Caches written before paths were stored as bytes hold text
+                st = os.stat(os.fsdecode(path))
+            except OSError:
+                stale.append((rowid,))
+                continue
+            if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) != (dev, ino, size, mtime_ns):
+                stale.append((rowid,))
+        self.conn.executemany("DELETE FROM digests WHERE rowid=?", stale)
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        return removed + len(stale)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+def compact_hash_cache(log_dir, max_age_days=HASH_CACHE_MAX_AGE_DAYS):
+    db_path = os.path.join(log_dir, HASH_CACHE_FILE)
+    if not os.path.exists(db_path):
+        return 0
+    cache = HashCache(db_path)
+    try:
+        return cache.compact(max_age_days)
+    finally:
+        cache.close()
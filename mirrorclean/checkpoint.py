@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import logging
+from datetime import datetime
+
+from .hashing import get_hash_algorithm, find_hash_algorithm
+from .scanner import ScanRules
+
+# Run state for --resume, written to the log folder. Digests computed so far are committed to
+# the hash cache (or CHECKPOINT_DIGESTS_FILE when the cache is off) at the same moments.
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_DIGESTS_FILE = "checkpoint.db"
+CHECKPOINT_INTERVAL = 30  # seconds
+CHECKPOINT_VERSION = 1
+
+# --- Checkpoints ---
+def write_json_atomic(path, data):
+    # ASCII-escaped, so paths that are not valid UTF-8 (like last_file) round-trip
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class Checkpoint:
+    # options are the run's settings as JSON values; digests is the HashCache to commit
+    def __init__(self, log_dir, options, digests, previous=None):
+        self.path = os.path.join(log_dir, CHECKPOINT_FILE)
+        self.digests = digests
+        self.last_write = time.monotonic()
+        self.state = {
+            "version": CHECKPOINT_VERSION,
+            "status": "running",
+            "started": time.time(),
+            "updated": time.time(),
+            "runs": previous["runs"] + 1 if previous else 1,
+            "options": options,
+            "discovered": 0,
+            "processed": 0,
+            "duplicates": 0,
+            "skipped": 0,
+            "last_file": None,
+            # What earlier, interrupted runs of this scan already did
+            "previous_duplicates": previous["previous_duplicates"] + previous["duplicates"] if previous else 0
+        }
+        self.write()
+
+    def update(self, processed, discovered, duplicates, skipped, last_file=None):
+        self.state.update(processed=processed, discovered=discovered, duplicates=duplicates,
+                          skipped=skipped)
+        if last_file:
+            self.state["last_file"] = last_file
+        if time.monotonic() - self.last_write >= CHECKPOINT_INTERVAL:
+            self.write()
+
+    def write(self):
+        if self.digests:
+            self.digests.flush()
+        self.state["updated"] = time.time()
+        try:
+            write_json_atomic(self.path, self.state)
+        except OSError as e:
+            logging.warning(f"Cannot write checkpoint {self.path}: {e}")
+        self.last_write = time.monotonic()
+
+    def finish(self, completed):
+        self.state["status"] = "completed" if completed else "interrupted"
+        self.write()
+
+def load_checkpoint(log_dir):
+    # State of the last run in log_dir if it did not complete, else None
+    try:
+        with open(os.path.join(log_dir, CHECKPOINT_FILE), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != CHECKPOINT_VERSION or state.get("status") == "completed":
+        return None
+    return state
+
+def describe_checkpoint(state):
+    started = datetime.fromtimestamp(state["started"]).strftime("%Y-%m-%d %H:%M")
+    return (f"scan started {started}: {state['processed']:,} of {state['discovered']:,} files "
+            f"processed, {state['duplicates'] + state['previous_duplicates']:,} duplicates handled")
+
+def checkpoint_options(state):
+    # remove_duplicate_files keyword arguments to continue the checkpointed run with
+    options = dict(state["options"])
+    label = find_hash_algorithm(options.pop("algorithm"))
+    if label is None:
+        raise ValueError("The checkpointed hash algorithm is not available")
+    options["hash_func"] = get_hash_algorithm(label)
+    options["directory"] = options.pop("roots")
+    options["device_workers"] = {int(dev): limit for dev, limit in options["device_workers"].items()}
+    if options.get("scan_rules"):
+        options["scan_rules"] = ScanRules(**options["scan_rules"])
+    return options
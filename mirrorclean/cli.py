@@ -0,0 +1,517 @@
+import os
+import re
+import sys
+import json
+import signal
+import pstats
+import cProfile
+import logging
+import argparse
+
+from .hashing import (
+    ALGORITHM_ALIASES, READ_MODES, DEFAULT_READ_MODE, DEFAULT_HASH_WORKERS, COMPARE_MODES,
+    DEFAULT_COMPARE_MODE, COMPARE_GROUP_LIMIT, cancel_event,
+    get_hash_algorithm, hash_algorithm_name
+)
+from .cache import HASH_CACHE_MAX_AGE_DAYS, compact_hash_cache
+from .actions import ACTION_MODES, DEFAULT_ACTION
+from .index import INDEX_MEMORY_BUDGET
+from .engine import BACKUP_DIR_NAME, LOG_DIR_NAME, remove_duplicate_files
+from .scanner import ScanRules, normalize_roots
+from .store import STORE_COMPRESSIONS, STORE_MANIFEST_FILE, restore_backup
+from .metrics import RunMetrics
+from .manifest import MANIFEST_LEVELS, export_manifest, merge_manifests, write_lines
+from .watch import WATCH_SETTLE_SECONDS, WATCH_POLL_SECONDS, WATCH_MODES, WATCH_COMPARE_MODES, watch_folders
+from .checkpoint import load_checkpoint, checkpoint_options
+from .plan import create_plan, read_plan_header, plan_directory, apply_plan
+
+PROFILE_TOP = 25  # functions printed by --profile
+
+# --- Command line interface ---
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="mirrorclean",
+        description="Find and remove duplicate files. Without a command the desktop app starts.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("gui", help="start the desktop app")
+
+    scan = commands.add_parser("scan", help="report duplicate groups as JSON without changing anything")
+    dedupe = commands.add_parser("dedupe", help="apply an action to every duplicate and report it as JSON")
+    plan = commands.add_parser("plan", help="scan and save the duplicate groups to a plan file")
+    plan.add_argument("--output", required=True, help="plan file to write (gzip JSON lines)")
+    for command in (scan, dedupe, plan):
+        command.add_argument("directory", nargs="+",
+                             help="folders to scan; files in earlier folders are kept first")
+        command.add_argument("--algorithm", default="sha256",
+                             help=f"hash algorithm: {', '.join(ALGORITHM_ALIASES)} or a registered label")
+        command.add_argument("--workers", type=int, default=DEFAULT_HASH_WORKERS,
+                             help="files hashed in parallel per disk (spinning disks get 1)")
+        command.add_argument("--device-workers", action="append", default=[], metavar="PATH=N",
+                             help="read limit for the disk holding PATH, overriding detection")
+        command.add_argument("--read-mode", choices=READ_MODES, default=DEFAULT_READ_MODE)
+        command.add_argument("--compare", choices=COMPARE_MODES, default=DEFAULT_COMPARE_MODE,
+                             help="compare: check small groups byte by byte instead of hashing, "
+                                  "exact: also confirm every digest match byte by byte")
+        command.add_argument("--compare-limit", type=int, default=COMPARE_GROUP_LIMIT,
+                             help="largest group checked byte by byte; larger groups are hashed")
+        command.add_argument("--include-empty", action="store_true", help="treat empty files as duplicates")
+        add_rule_arguments(command)
+        command.add_argument("--no-cache", action="store_true", help="do not use the persistent hash cache")
+        command.add_argument("--memory-budget", type=int, default=INDEX_MEMORY_BUDGET // (1024 * 1024),
+                             metavar="MB", help="memory shared by the size and sample stage tables and the duplicate index; "
+                                  "past it the largest moves to disk")
+        command.add_argument("--log-dir",
+                             help=f"log and cache folder (default: first DIRECTORY/{LOG_DIR_NAME})")
+        command.add_argument("--verbose", action="store_true", help="print every log line to stderr")
+        command.add_argument("--resume", action="store_true",
+                             help="continue the last interrupted scan of these folders (all of them, as given "
+                                  "then) with its options; only files changed since then are hashed again")
+        command.add_argument("--no-checkpoint", action="store_true",
+                             help="do not save progress for --resume")
+        command.add_argument("--profile", nargs="?", const="mirrorclean.prof", metavar="FILE",
+                             help="run under cProfile, print the top functions to stderr and save the "
+                                  "stats to FILE (default mirrorclean.prof); only the engine thread is "
+                                  "profiled, add --workers 1 to include reading and hashing")
+    dedupe.add_argument("--action", choices=ACTION_MODES, default=DEFAULT_ACTION)
+    dedupe.add_argument("--backup-dir", help=f"backup folder (default: first DIRECTORY/{BACKUP_DIR_NAME})")
+    dedupe.add_argument("--preserve-structure", action="store_true",
+                        help="keep the folder hierarchy inside the backup folder")
+    dedupe.add_argument("--compress", choices=STORE_COMPRESSIONS, default="none",
+                        help="compression of the blobs written by --action store")
+
+    apply = commands.add_parser("apply", help="act on the duplicates in a plan file without rehashing")
+    apply.add_argument("plan", help="plan file written by the plan command")
+    apply.add_argument("--action", choices=ACTION_MODES, default=DEFAULT_ACTION)
+    apply.add_argument("--backup-dir", help=f"backup folder (default: DIRECTORY/{BACKUP_DIR_NAME})")
+    apply.add_argument("--preserve-structure", action="store_true",
+                       help="keep the folder hierarchy inside the backup folder")
+    apply.add_argument("--compress", choices=STORE_COMPRESSIONS, default="none",
+                       help="compression of the blobs written by --action store")
+    apply.add_argument("--log-dir", help=f"log folder (default: DIRECTORY/{LOG_DIR_NAME})")
+    apply.add_argument("--verbose", action="store_true", help="print every log line to stderr")
+
+    restore = commands.add_parser("restore", help="recreate files removed by --action store")
+    restore.add_argument("backup_dir", help="backup folder holding the store's manifest.jsonl")
+    restore.add_argument("--only", action="append", default=[], metavar="PATH",
+                         help="restore only files at or below PATH")
+    restore.add_argument("--overwrite", action="store_true", help="replace files that exist again")
+    restore.add_argument("--log-dir", help=f"log folder (default: {LOG_DIR_NAME} next to BACKUP_DIR)")
+    restore.add_argument("--verbose", action="store_true", help="print every log line to stderr")
+
+    watch = commands.add_parser("watch", help="keep watching folders and act on new duplicates as they appear")
+    watch.add_argument("directory", nargs="+", help="folders to watch; files in earlier folders are kept first")
+    watch.add_argument("--action", choices=ACTION_MODES, default=DEFAULT_ACTION)
+    watch.add_argument("--backup-dir", help=f"backup folder (default: first DIRECTORY/{BACKUP_DIR_NAME})")
+    watch.add_argument("--preserve-structure", action="store_true",
+                       help="keep the folder hierarchy inside the backup folder")
+    watch.add_argument("--compress", choices=STORE_COMPRESSIONS, default="none",
+                       help="compression of the blobs written by --action store")
+    watch.add_argument("--algorithm", default="sha256",
+                       help=f"hash algorithm: {', '.join(ALGORITHM_ALIASES)} or a registered label")
+    watch.add_argument("--read-mode", choices=READ_MODES, default=DEFAULT_READ_MODE)
+    watch.add_argument("--compare", choices=WATCH_COMPARE_MODES, default="hash",
+                       help="exact: confirm every digest match byte by byte")
+    watch.add_argument("--include-empty", action="store_true", help="treat empty files as duplicates")
+    add_rule_arguments(watch)
+    watch.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS, metavar="SECONDS",
+                       help="wait until a file has not changed for this long before checking it")
+    watch.add_argument("--mode", choices=WATCH_MODES, default="auto",
+                       help="inotify: kernel change events (Linux), poll: rescan periodically")
+    watch.add_argument("--poll-interval", type=float, default=WATCH_POLL_SECONDS, metavar="SECONDS")
+    watch.add_argument("--dry-run", action="store_true", help="only log the duplicates found")
+    watch.add_argument("--log-dir", help=f"log and cache folder (default: first DIRECTORY/{LOG_DIR_NAME})")
+    watch.add_argument("--verbose", action="store_true", help="print every log line to stderr")
+
+    export = commands.add_parser("export", help="write a sorted scan manifest to merge with other hosts' or shards'")
+    export.add_argument("directory", nargs="+", help="folders to list")
+    export.add_argument("--output", required=True, help="manifest file to write (gzip JSON lines)")
+    export.add_argument("--level", choices=MANIFEST_LEVELS, default="sample",
+                        help="sample: full digests only where already known (small files, cache hits), "
+                             "full: hash every file")
+    export.add_argument("--host", help="name of this machine in merged reports (default: host name)")
+    export.add_argument("--algorithm", default="sha256",
+                        help=f"hash algorithm: {', '.join(ALGORITHM_ALIASES)} or a registered label")
+    export.add_argument("--workers", type=int, default=DEFAULT_HASH_WORKERS,
+                        help="files hashed in parallel per disk (spinning disks get 1)")
+    export.add_argument("--device-workers", action="append", default=[], metavar="PATH=N",
+                        help="read limit for the disk holding PATH, overriding detection")
+    export.add_argument("--read-mode", choices=READ_MODES, default=DEFAULT_READ_MODE)
+    export.add_argument("--include-empty", action="store_true", help="list empty files too")
+    add_rule_arguments(export)
+    export.add_argument("--no-cache", action="store_true", help="do not use the persistent hash cache")
+    export.add_argument("--log-dir", help=f"log and cache folder (default: first DIRECTORY/{LOG_DIR_NAME})")
+    export.add_argument("--verbose", action="store_true", help="print every log line to stderr")
+
+    merge = commands.add_parser("merge", help="report duplicate groups across exported manifests")
+    merge.add_argument("manifest", nargs="+", help="manifests written by export; files in earlier ones are kept first")
+    merge.add_argument("--cross-host", action="store_true", help="only report groups spanning several hosts")
+    merge.add_argument("--output", help="write the groups to this file (gzip JSON lines) instead of the report")
+
+    compact = commands.add_parser("compact-cache", help="evict stale entries from the hash cache")
+    compact.add_argument("directory", help="scanned folder whose cache to compact")
+    compact.add_argument("--log-dir", help=f"log and cache folder (default: DIRECTORY/{LOG_DIR_NAME})")
+    compact.add_argument("--max-age-days", type=float, default=HASH_CACHE_MAX_AGE_DAYS)
+    return parser
+
+def add_rule_arguments(command):
+    command.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                         help="skip files and folders matching a glob (name, or path below the "
+                              "folder when it contains /) or a re:REGEX; excluded folders are not entered")
+    command.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                         help="only scan files matching a pattern (same syntax as --exclude)")
+    command.add_argument("--ext", action="append", default=[], metavar="EXT",
+                         help="only scan these file extensions, e.g. --ext jpg,png")
+    command.add_argument("--exclude-ext", action="append", default=[], metavar="EXT",
+                         help="skip these file extensions")
+    command.add_argument("--min-size", type=parse_size, default=0, metavar="SIZE",
+                         help="skip smaller files (bytes, or with a K, M or G suffix)")
+    command.add_argument("--max-size", type=parse_size, metavar="SIZE", help="skip larger files")
+    command.add_argument("--one-filesystem", action="store_true",
+                         help="do not descend into other mounted filesystems")
+    command.add_argument("--skip-symlinks", action="store_true", help="ignore symlinked files")
+
+def parse_size(value):
+    # "1500", "64K", "10M", "2G" to bytes
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    value = value.strip().upper().rstrip("B")
+    try:
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad size: {value}")
+
+def split_list(values):
+    # Repeated options that may also hold comma separated lists
+    return [item for value in values for item in value.split(",") if item.strip()]
+
+def get_scan_rules(args):
+    try:
+        return ScanRules(exclude=args.exclude, include=args.include, extensions=split_list(args.ext),
+                         exclude_extensions=split_list(args.exclude_ext), min_size=args.min_size,
+                         max_size=args.max_size, one_filesystem=args.one_filesystem,
+                         skip_symlinks=args.skip_symlinks)
+    except re.error as e:
+        raise SystemExit(f"mirrorclean: bad --exclude/--include pattern: {e}")
+
+def console_handler(args):
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    return console
+
+def get_roots(args):
+    roots = [os.path.abspath(directory) for directory in args.directory]
+    for root, directory in zip(roots, args.directory):
+        if not os.path.isdir(root):
+            raise SystemExit(f"mirrorclean: not a folder: {directory}")
+    return roots
+
+def get_hash_func(args):
+    try:
+        return get_hash_algorithm(args.algorithm)
+    except KeyError:
+        raise SystemExit(f"mirrorclean: unknown algorithm: {args.algorithm} "
+                         f"(use {', '.join(ALGORITHM_ALIASES)} or a registered label)")
+
+def get_device_workers(args):
+    # "PATH=N" options to {st_dev: N}
+    device_workers = {}
+    for option in args.device_workers:
+        path, _, limit = option.rpartition("=")
+        try:
+            device_workers[os.stat(path).st_dev] = int(limit)
+        except (OSError, ValueError):
+            raise SystemExit(f"mirrorclean: bad --device-workers value: {option}")
+    return device_workers
+
+def scan_options(args):
+    # remove_duplicate_files keywords from the command line, or from the checkpoint with --resume
+    roots = get_roots(args)
+    log_dir = args.log_dir or os.path.join(roots[0], LOG_DIR_NAME)
+    if args.resume:
+        state = load_checkpoint(log_dir)
+        if state is None:
+            raise SystemExit(f"mirrorclean: no interrupted scan to resume in {log_dir}")
+        options = checkpoint_options(state)
+        # The checkpoint's folders are scanned; never silently swap in other ones
+        if normalize_roots(roots) != normalize_roots(options["directory"]):
+            raise SystemExit(f"mirrorclean: the interrupted scan in {log_dir} covered "
+                             f"{', '.join(options['directory'])}, not {', '.join(roots)}")
+        options["resume"] = True
+    else:
+        options = {
+            "directory": roots,
+            "backup_dir": getattr(args, "backup_dir", None) or os.path.join(roots[0], BACKUP_DIR_NAME),
+            "hash_func": get_hash_func(args),
+            "preserve_structure": getattr(args, "preserve_structure", False),
+            "include_empty": args.include_empty,
+            "use_cache": not args.no_cache,
+            "workers": max(1, args.workers),
+            "device_workers": get_device_workers(args),
+            "compare_mode": args.compare,
+            "compare_group_limit": args.compare_limit,
+            "memory_budget": args.memory_budget * 1024 * 1024,
+            "read_mode": args.read_mode,
+            "action": getattr(args, "action", DEFAULT_ACTION),
+            "store_compression": getattr(args, "compress", "none"),
+            "scan_rules": get_scan_rules(args)
+        }
+    options.update(log_dir=log_dir, log_handler=console_handler(args), dry_run=args.command != "dedupe",
+                   checkpoints=not args.no_checkpoint, metrics=RunMetrics())
+    return options
+
+def run_plan(args):
+    options = scan_options(args)
+    roots = options.pop("directory")
+    log_dir = options.pop("log_dir")
+    hash_func = options.pop("hash_func")
+    metrics = options["metrics"]
+    for name in ("backup_dir", "preserve_structure", "action", "dry_run", "store_compression"):
+        options.pop(name)
+    plan_path = os.path.abspath(args.output)
+    cancel_event.clear()
+    duplicates, skipped, groups = create_plan(roots, plan_path, log_dir, hash_func, **options)
+    return {
+        "command": args.command,
+        "directory": roots[0],
+        "roots": roots,
+        "algorithm": hash_algorithm_name(hash_func),
+        "plan": plan_path,
+        "groups": groups,
+        "duplicates": duplicates,
+        "skipped": skipped,
+        "cancelled": cancel_event.is_set(),
+        "metrics": metrics.snapshot()
+    }
+
+def run_apply(args):
+    plan_path = os.path.abspath(args.plan)
+    if not os.path.isfile(plan_path):
+        raise SystemExit(f"mirrorclean: no such plan file: {args.plan}")
+    directory = plan_directory(read_plan_header(plan_path))
+    cancel_event.clear()
+    duplicates, skipped, changed = apply_plan(
+        plan_path, args.log_dir or os.path.join(directory, LOG_DIR_NAME),
+        backup_dir=args.backup_dir,
+        action=args.action,
+        preserve_structure=args.preserve_structure,
+        log_handler=console_handler(args),
+        store_compression=args.compress
+    )
+    return {
+        "command": args.command,
+        "directory": directory,
+        "plan": plan_path,
+        "action": args.action,
+        "duplicates": duplicates,
+        "skipped": skipped,
+        "changed": changed,
+        "cancelled": cancel_event.is_set()
+    }
+
+def run_restore(args):
+    backup_dir = os.path.abspath(args.backup_dir)
+    if not os.path.isfile(os.path.join(backup_dir, STORE_MANIFEST_FILE)):
+        raise SystemExit(f"mirrorclean: no backup store in {args.backup_dir}")
+    cancel_event.clear()
+    restored, skipped, failed = restore_backup(
+        backup_dir, args.log_dir or os.path.join(os.path.dirname(backup_dir), LOG_DIR_NAME),
+        prefixes=args.only,
+        overwrite=args.overwrite,
+        log_handler=console_handler(args)
+    )
+    return {
+        "command": args.command,
+        "backup_dir": backup_dir,
+        "restored": restored,
+        "skipped": skipped,
+        "failed": failed,
+        "cancelled": cancel_event.is_set()
+    }
+
+def run_watch(args):
+    # Runs until Ctrl+C or SIGTERM, then reports what was handled
+    roots = get_roots(args)
+    hash_func = get_hash_func(args)
+    previous = {sig: signal.signal(sig, lambda *_: cancel_event.set()) for sig in (signal.SIGINT, signal.SIGTERM)}
+    cancel_event.clear()
+    try:
+        duplicates, skipped, handled = watch_folders(
+            roots, args.backup_dir or os.path.join(roots[0], BACKUP_DIR_NAME),
+            args.log_dir or os.path.join(roots[0], LOG_DIR_NAME), hash_func,
+            preserve_structure=args.preserve_structure,
+            log_handler=console_handler(args),
+            mode=args.mode,
+            poll_interval=args.poll_interval,
+            action=args.action,
+            dry_run=args.dry_run,
+            include_empty=args.include_empty,
+            compare_mode=args.compare,
+            scan_rules=get_scan_rules(args),
+            store_compression=args.compress,
+            settle=args.settle,
+            read_mode=args.read_mode
+        )
+    except OSError as e:
+        raise SystemExit(f"mirrorclean: cannot watch: {e.strerror}")
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    return {
+        "command": args.command,
+        "directory": roots[0],
+        "roots": roots,
+        "algorithm": hash_algorithm_name(hash_func),
+        "action": None if args.dry_run else args.action,
+        "checked": handled,
+        "duplicates": duplicates,
+        "skipped": skipped
+    }
+
+def run_export(args):
+    roots = get_roots(args)
+    manifest_path = os.path.abspath(args.output)
+    hash_func = get_hash_func(args)
+    cancel_event.clear()
+    files, skipped = export_manifest(
+        roots, manifest_path, args.log_dir or os.path.join(roots[0], LOG_DIR_NAME), hash_func,
+        level=args.level,
+        host=args.host,
+        include_empty=args.include_empty,
+        use_cache=not args.no_cache,
+        workers=max(1, args.workers),
+        device_workers=get_device_workers(args),
+        read_mode=args.read_mode,
+        scan_rules=get_scan_rules(args),
+        log_handler=console_handler(args)
+    )
+    return {
+        "command": args.command,
+        "directory": roots[0],
+        "roots": roots,
+        "algorithm": hash_algorithm_name(hash_func),
+        "manifest": manifest_path,
+        "files": files,
+        "skipped": skipped,
+        "cancelled": cancel_event.is_set()
+    }
+
+def run_merge(args):
+    manifest_paths = [os.path.abspath(path) for path in args.manifest]
+    for path, name in zip(manifest_paths, args.manifest):
+        if not os.path.isfile(path):
+            raise SystemExit(f"mirrorclean: no such manifest: {name}")
+    try:
+        headers, groups = merge_manifests(manifest_paths, args.cross_host)
+    except ValueError as e:
+        raise SystemExit(f"mirrorclean: {e}")
+    counts = {"confirmed": 0, "unconfirmed": 0, "duplicates": 0, "reclaimable_bytes": 0}
+    kept = []
+
+    def counted():
+        for group in groups:
+            if group["confirmed"]:
+                counts["confirmed"] += 1
+                counts["duplicates"] += len(group["members"]) - 1
+                counts["reclaimable_bytes"] += group["size"] * (len(group["members"]) - 1)
+            else:
+                counts["unconfirmed"] += 1
+            yield group
+
+    try:
+        if args.output:
+            write_lines(os.path.abspath(args.output), {"manifests": manifest_paths, "cross_host": args.cross_host},
+                        counted())
+        else:
+            kept.extend(counted())
+    except ValueError as e:
+        raise SystemExit(f"mirrorclean: {e}")
+    for header in headers:
+        if not header["complete"]:
+            print(f"warning: the manifest of {header['host']} comes from a cancelled export", file=sys.stderr)
+    result = {
+        "command": args.command,
+        "manifests": [{"path": path, "host": header["host"], "roots": header["roots"], "level": header["level"],
+                       "files": header["files"], "complete": header["complete"]}
+                      for path, header in zip(manifest_paths, headers)],
+        "algorithm": headers[0]["algorithm"],
+        **counts
+    }
+    if args.output:
+        result["output"] = os.path.abspath(args.output)
+    else:
+        result["groups"] = kept
+    return result
+
+def run_scan(args):
+    options = scan_options(args)
+    groups = {}
+
+    def on_duplicate(path, st, kept_path, kept_st, digest):
+        group = groups.get(kept_path)
+        if group is None:
+            group = groups[kept_path] = {"digest": digest, "size": st.st_size, "kept": kept_path,
+                                         "duplicates": []}
+        group["duplicates"].append(path)
+
+    cancel_event.clear()
+    duplicates, skipped = remove_duplicate_files(duplicate_callback=on_duplicate, **options)
+    return {
+        "command": args.command,
+        "directory": options["directory"][0],
+        "roots": options["directory"],
+        "algorithm": hash_algorithm_name(options["hash_func"]),
+        "action": None if options["dry_run"] else options["action"],
+        "resumed": args.resume,
+        "duplicates": duplicates,
+        "skipped": skipped,
+        "cancelled": cancel_event.is_set(),
+        "metrics": options["metrics"].snapshot(),
+        "groups": list(groups.values())
+    }
+
+def run_command(args):
+    if args.command == "compact-cache":
+        directory = os.path.abspath(args.directory)
+        removed = compact_hash_cache(args.log_dir or os.path.join(directory, LOG_DIR_NAME),
+                                     args.max_age_days)
+        return {"command": args.command, "directory": directory, "removed": removed}
+    if args.command == "plan":
+        return run_plan(args)
+    if args.command == "apply":
+        return run_apply(args)
+    if args.command == "restore":
+        return run_restore(args)
+    if args.command == "watch":
+        return run_watch(args)
+    if args.command == "export":
+        return run_export(args)
+    if args.command == "merge":
+        return run_merge(args)
+    return run_scan(args)
+
+def run_profiled(args):
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(run_command, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        print(f"Profile saved to {args.profile}", file=sys.stderr)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command in (None, "gui"):
+        # Imported here so headless commands never load tkinter
+        from .gui import main as gui_main
+        gui_main()
+        return 0
+
+    try:
+        result = run_profiled(args) if getattr(args, "profile", None) else run_command(args)
+    except KeyboardInterrupt:
+        cancel_event.set()
+        return 130
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
@@ -0,0 +1,100 @@
+import os
+import heapq
+import itertools
+import threading
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Reads in flight per spinning disk - a second reader only makes the head seek back and forth
+ROTATIONAL_DEVICE_WORKERS = 1
+
+# Files queued per device ahead of the reads, so they can be reordered by inode
+DEVICE_LOOKAHEAD = 64
+
+# --- Device detection ---
+@functools.lru_cache(maxsize=None)
+def is_rotational(st_dev):
+    # True/False from Linux sysfs, None when unknown (other platforms, network and virtual
+    # filesystems). Partitions have no queue of their own, so their parent disk is checked.
+    if not hasattr(os, "major"):
+        return None
+    base = f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"
+    for path in (os.path.join(base, "queue", "rotational"), os.path.join(base, "..", "queue", "rotational")):
+        try:
+            with open(path) as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+def device_limit(st_dev, workers, device_workers=None):
+    # device_workers maps st_dev to an explicit limit and wins over detection
+    if device_workers and st_dev in device_workers:
+        return max(1, device_workers[st_dev])
+    if is_rotational(st_dev):
+        return ROTATIONAL_DEVICE_WORKERS
+    return workers
+
+# --- Per-device I/O scheduler ---
+class _Device:
+    def __init__(self, limit):
+        self.limit = limit
+        self.running = 0
+        self.queue = []  # heap of (st_ino, seq, fn, item, future)
+        self.executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="hash")
+
+class DeviceScheduler:
+    # Runs fn(item) for (path, st) items with at most device_limit() calls in flight per
+    # st_dev. Queued work on a device starts in inode order, which on most filesystems
+    # follows the on-disk layout, so a spinning disk reads mostly forward.
+    def __init__(self, workers, device_workers=None):
+        self.workers = workers
+        self.device_workers = device_workers
+        self.devices = {}
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+
+    def limit(self, st_dev):
+        device = self.devices.get(st_dev)
+        return device.limit if device else device_limit(st_dev, self.workers, self.device_workers)
+
+    def submit(self, fn, item):
+        st = item[1]
+        future = Future()
+        with self.lock:
+            device = self.devices.get(st.st_dev)
+            if device is None:
+                device = self.devices[st.st_dev] = _Device(self.limit(st.st_dev))
+            heapq.heappush(device.queue, (st.st_ino, next(self.counter), fn, item, future))
+            self._dispatch(device)
+        return future
+
+    def _dispatch(self, device):
+        # Called with the lock held
+        while device.running < device.limit and device.queue:
+            _, _, fn, item, future = heapq.heappop(device.queue)
+            if future.set_running_or_notify_cancel():
+                device.running += 1
+                device.executor.submit(self._run, device, fn, item, future)
+
+    def _run(self, device, fn, item, future):
+        try:
+            result = fn(item)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            with self.lock:
+                device.running -= 1
+                self._dispatch(device)
+
+    def shutdown(self):
+        # Drops queued work and waits for the reads already running
+        with self.lock:
+            for device in self.devices.values():
+                for _, _, _, _, future in device.queue:
+                    future.cancel()
+                device.queue.clear()
+        for device in self.devices.values():
+            device.executor.shutdown(wait=True)
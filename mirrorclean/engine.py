@@ -0,0 +1,440 @@
+import os
+import time
+import logging
+
+from .hashing import (
+    PARTIAL_HASH_SETTINGS, DEFAULT_HASH_WORKERS, DEFAULT_READ_MODE, COMPARE_MODES, DEFAULT_COMPARE_MODE,
+    COMPARE_GROUP_LIMIT, cancel_event, hash_algorithm_name, get_file_hash, compare_files,
+    get_sample_ranges, get_partial_hash, partial_hash_kind, hash_in_parallel
+)
+from .cache import HASH_CACHE_FILE, HashCache
+from .actions import ACTION_MODES, DEFAULT_ACTION, ReflinkUnsupported, apply_action, describe_action
+from .scanner import ScanRules, normalize_roots, scan_roots
+from .index import INDEX_MEMORY_BUDGET, HELD, RELEASED, IndexPool, DuplicateIndex
+from .devices import DeviceScheduler
+from .logs import setup_logging, flush_logging, open_journal
+from .store import BackupStore
+from .metrics import RunMetrics, write_metrics
+from .checkpoint import CHECKPOINT_DIGESTS_FILE, Checkpoint, load_checkpoint, describe_checkpoint
+
+# Default output folders, created inside the scanned folder
+BACKUP_DIR_NAME = "backup_duplicates"
+LOG_DIR_NAME = "logs"
+INDEX_SPILL_FILE = "{table}_{pid}.db"
+
+# --- Helpers ---
+def format_size(num_bytes):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if num_bytes < 1024 or unit == "TB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+def common_root(roots):
+    # Folder that backup paths are made relative to; None for roots on different Windows drives
+    try:
+        return os.path.commonpath(roots)
+    except ValueError:
+        return None
+
+# --- Acting on one duplicate ---
+def act_on_duplicate(action, path, size, digest, kept_path, directory, backup_dir, preserve_structure,
+                     journal, store=None):
+    # Returns "ok", "linked" (already the same inode as the kept file) or "skipped"
+    started = time.perf_counter()
+    try:
+        if action in ("hardlink", "reflink") and os.path.samefile(path, kept_path):
+            logging.info(f"Already linked: {path} → {kept_path}")
+            journal.record(action, path, size, digest, kept_path, kept_path, status="already-linked")
+            return "linked"
+        destination = apply_action(action, path, kept_path, directory, backup_dir, preserve_structure,
+                                   digest, store)
+        journal.record(action, path, size, digest, kept_path, destination, time.perf_counter() - started)
+        logging.info(describe_action(action, path, destination))
+        return "ok"
+    except PermissionError as e:
+        logging.warning(f"File locked: {path}. Skipped.")
+        journal.record(action, path, size, digest, kept_path,
+                       seconds=time.perf_counter() - started, status="skipped", error=str(e))
+    except ReflinkUnsupported as e:
+        logging.warning(f"Cannot reflink {path}: {e.strerror}. Left in place.")
+        journal.record(action, path, size, digest, kept_path,
+                       seconds=time.perf_counter() - started, status="skipped", error=e.strerror)
+    except Exception as e:
+        logging.error(f"Error processing {path}: {e}")
+        journal.record(action, path, size, digest, kept_path,
+                       seconds=time.perf_counter() - started, status="error", error=str(e))
+    return "skipped"
+
+# --- Remove duplicates function ---
+def remove_duplicate_files(directory, backup_dir, log_dir, hash_func, preserve_structure, 
+                           progress_callback=None, status_callback=None, log_handler=None,
+                           include_empty=False, partial_settings=None, use_cache=True,
+                           workers=DEFAULT_HASH_WORKERS, read_mode=DEFAULT_READ_MODE, action=DEFAULT_ACTION,
+                           dry_run=False, duplicate_callback=None, device_workers=None,
+                           compare_mode=DEFAULT_COMPARE_MODE, compare_group_limit=COMPARE_GROUP_LIMIT,
+                           memory_budget=INDEX_MEMORY_BUDGET, checkpoints=True, resume=False,
+                           scan_rules=None, store_compression="none", metrics=None):
+    # directory is one folder or a list of folders; duplicates are found across all of them
+    # and the first root wins. Returns (duplicates, skipped). With dry_run, duplicates are only
+    # reported, never touched. duplicate_callback(path, st, kept_path, kept_st, digest) is
+    # called for every duplicate found (digest is None for files matched by comparison).
+    # device_workers maps st_dev to a read limit. compare_mode is one of COMPARE_MODES.
+    # The files held back by stages 1 and 2 and the index of distinct contents share
+    # memory_budget bytes; past it, the largest of them moves to a file in log_dir.
+    # With checkpoints, progress and digests are saved to log_dir as the scan runs; resume
+    # reuses the digests of the last interrupted run for every file whose stat is unchanged.
+    # scan_rules (ScanRules) prune the walk; backup_dir and log_dir are always skipped.
+    # The store action keeps blobs compressed with store_compression (one of STORE_COMPRESSIONS).
+    # metrics (RunMetrics) collects counters and time per stage; pass one in to watch it live.
+    # It is written to metrics_<time>.json in log_dir when the run ends.
+    log_file = setup_logging(log_dir, log_handler)
+    roots = normalize_roots(directory)
+    base = common_root(roots)
+    if base is None and preserve_structure:
+        logging.warning("Folders are on different drives; backups are stored without folder structure.")
+        preserve_structure = False
+
+    if action not in ACTION_MODES:
+        raise ValueError(f"Unknown action: {action}")
+    if compare_mode not in COMPARE_MODES:
+        raise ValueError(f"Unknown compare mode: {compare_mode}")
+    if action in ("copy", "move") and not dry_run and not os.path.exists(backup_dir):
+        os.makedirs(backup_dir)
+
+    previous = load_checkpoint(log_dir) if resume else None
+    if previous:
+        logging.info(f"Resuming {describe_checkpoint(previous)}.")
+    elif resume:
+        logging.warning("No interrupted scan to resume, starting from the beginning.")
+
+    # Checkpointed digests go to the hash cache, or to a file of their own when it is off
+    digests_path = os.path.join(log_dir, CHECKPOINT_DIGESTS_FILE)
+    if use_cache:
+        cache = HashCache(os.path.join(log_dir, HASH_CACHE_FILE))
+    elif checkpoints:
+        if not previous and os.path.exists(digests_path):
+            os.remove(digests_path)
+        cache = HashCache(digests_path)
+    else:
+        cache = None
+    checkpoint = None
+    if checkpoints:
+        options = {
+            "roots": roots,
+            "backup_dir": backup_dir,
+            "algorithm": hash_algorithm_name(hash_func),
+            "preserve_structure": preserve_structure,
+            "include_empty": include_empty,
+            "partial_settings": partial_settings,
+            "use_cache": use_cache,
+            "workers": workers,
+            "device_workers": {str(dev): limit for dev, limit in (device_workers or {}).items()},
+            "read_mode": read_mode,
+            "action": action,
+            "dry_run": dry_run,
+            "compare_mode": compare_mode,
+            "compare_group_limit": compare_group_limit,
+            "memory_budget": memory_budget,
+            "scan_rules": scan_rules.as_dict() if scan_rules else None,
+            "store_compression": store_compression
+        }
+        checkpoint = Checkpoint(log_dir, options, cache, previous)
+    journal = open_journal(log_dir, log_file)
+    pool = IndexPool(memory_budget)
+    size_table, sample_table, index = (
+        DuplicateIndex(os.path.join(log_dir, INDEX_SPILL_FILE.format(table=table, pid=os.getpid())), pool=pool)
+        for table in ("size_stage", "sample_stage", "duplicate_index"))
+    # Never scan our own output, wherever it is
+    rules = (scan_rules or ScanRules()).excluding(backup_dir, log_dir)
+    store = BackupStore(backup_dir, store_compression, hash_func) if action == "store" and not dry_run else None
+    metrics = metrics or RunMetrics()
+    # One scheduler for every stage, so a spinning disk never has more than its readers
+    scheduler = DeviceScheduler(workers, device_workers) if workers > 1 else None
+    completed = False
+    try:
+        result = _remove_duplicates(roots, base, backup_dir, hash_func, preserve_structure,
+                                    progress_callback, status_callback, include_empty,
+                                    partial_settings, cache, workers, device_workers, read_mode,
+                                    action, dry_run, duplicate_callback, journal, compare_mode,
+                                    compare_group_limit, size_table, sample_table, index, checkpoint,
+                                    rules, store, metrics, scheduler)
+        metrics.counters.update(duplicates=result[0], skipped=result[1])
+        completed = not cancel_event.is_set()
+        return result
+    finally:
+        if scheduler:
+            scheduler.shutdown()
+        metrics.finish()
+        logging.info(metrics.summary())
+        try:
+            write_metrics(log_dir, log_file, metrics, completed, {
+                "roots": roots, "algorithm": hash_algorithm_name(hash_func), "workers": workers,
+                "read_mode": read_mode, "compare_mode": compare_mode, "action": action, "dry_run": dry_run
+            })
+        except OSError as e:
+            logging.warning(f"Cannot write metrics: {e}")
+        size_table.close()
+        sample_table.close()
+        index.close()
+        if store:
+            store.close()
+        if checkpoint:
+            checkpoint.finish(completed)
+        if cache:
+            logging.info(f"Hash cache: {cache.hits} hits, {cache.misses} misses.")
+            cache.close()
+        if completed and not use_cache and os.path.exists(digests_path):
+            os.remove(digests_path)
+        journal.close()
+        flush_logging()
+
+def _remove_duplicates(roots, directory, backup_dir, hash_func, preserve_structure, progress_callback,
+                       status_callback, include_empty, partial_settings, cache, workers,
+                       device_workers, read_mode, action, dry_run, duplicate_callback, journal,
+                       compare_mode, compare_group_limit, size_table, sample_table, file_hashes,
+                       checkpoint, rules, store, metrics, scheduler):
+    duplicate_count, skipped_count = 0, 0
+    discovered, processed = 0, 0
+    empty_count, full_hashed, compared, distinct = 0, 0, 0, 0
+    algorithm = hash_algorithm_name(hash_func)
+    settings = dict(PARTIAL_HASH_SETTINGS, **(partial_settings or {}))
+    partial_kind = partial_hash_kind(settings)
+    sampled = settings["head_size"] + settings["tail_size"] + settings["sample_count"] * settings["sample_size"]
+
+    def report(current_path=None):
+        stage = metrics.switch("report")
+        if checkpoint:
+            checkpoint.update(processed, discovered, duplicate_count, skipped_count, current_path)
+        if progress_callback:
+            try:
+                progress_callback(processed, discovered)
+            except Exception:
+                pass
+        if status_callback and current_path:
+            try:
+                status_callback(os.path.basename(current_path))
+            except Exception:
+                pass
+        metrics.switch(stage)
+
+    # Stage 1: group files by size as they are discovered - a file whose size no other
+    # file shares cannot be a duplicate. The first file of a size waits here until a
+    # second one shows up, then both move on to stage 2. Held files live in size_table, a
+    # compact index that moves to disk with the others past the memory budget.
+
+    def size_stage():
+        nonlocal discovered, processed, skipped_count, empty_count
+        for path, st in metrics.timed(scan_roots(roots, rules), "walk"):
+            if cancel_event.is_set():
+                return
+            discovered += 1
+            metrics.count("files_found")
+            if st is None:
+                skipped_count += 1
+                processed += 1
+            elif st.st_size == 0 and not include_empty:
+                empty_count += 1
+                metrics.count("empty_files")
+                processed += 1
+            else:
+                # Most files stay here for the whole scan
+                first = size_table.take_first(st.st_size, path, st)
+                if first is not HELD:
+                    if first is not RELEASED:
+                        yield first[:2]
+                    yield path, st
+            report()
+
+    # Stage 2: digest head, tail and sampled middle blocks - most same-size files differ early.
+    # The first file of each (size, sample digest) is held in sample_table like stage 1.
+    def sample_kind(size):
+        # Files covered by the samples are hashed whole, so cache them as full digests
+        return "full" if get_sample_ranges(size, **settings) is None else partial_kind
+
+    def sample_jobs():
+        for path, st in size_stage():
+            yield (path, st), cache.get(st, algorithm, sample_kind(st.st_size)) if cache else None
+
+    def hash_sample(item):
+        path, st = item
+        return get_partial_hash(path, hash_func, st.st_size, read_mode=read_mode, **settings)
+
+    def sample_stage():
+        nonlocal processed, skipped_count
+        jobs = metrics.timed(sample_jobs(), "cache") if cache else sample_jobs()
+        results = hash_in_parallel(jobs,
+                                   metrics.timed_call("sample_work", hash_sample), workers, device_workers,
+                                   lambda depth: metrics.peak("sample_queue", depth), scheduler)
+        for (path, st), partial_hash, computed in results:
+            if cancel_event.is_set():
+                return
+            if not partial_hash:
+                skipped_count += 1
+                processed += 1
+                continue
+            if computed:
+                metrics.count("sample_reads")
+                metrics.count("sample_bytes", min(st.st_size, sampled))
+                if cache:
+                    cache.put(path, st, algorithm, sample_kind(st.st_size), partial_hash)
+            else:
+                metrics.count("sample_cache_hits")
+
+            # Small files were read whole, so the sample digest already is the full hash
+            full_hash = partial_hash if get_sample_ranges(st.st_size, **settings) is None else None
+            key = (st.st_size, partial_hash)
+            first = sample_table.take_first(key, path, st, full_hash)
+            if first is HELD:
+                continue
+            if first is not RELEASED:
+                yield first + (key,)
+            yield path, st, full_hash, key
+
+    # Stage 3: full-content hash for files that still collide. Same-content files share a
+    # size and sample digest, so they reach this stage in discovery order and the first
+    # one found is the one kept.
+    # In compare mode the first file of a group is not hashed; the next files are compared
+    # with it byte by byte, and the group's key stands in for its digest. Past the group
+    # limit files are hashed again, and the first file once ("alias") so they can match it.
+    compare_groups = {}  # (size, sample digest) -> [first path, first stat, files seen, first hashed]
+
+    def full_jobs():
+        for path, st, file_hash, key in metrics.timed(sample_stage(), "sample"):
+            if file_hash is None and cache:
+                file_hash = cache.get(st, algorithm, "full")
+                if file_hash:
+                    metrics.count("full_cache_hits")
+            if compare_mode == "hash":
+                yield (path, st, "hash", key), file_hash
+                continue
+            if key not in compare_groups:
+                # A known digest (small file or cache hit) makes comparing pointless
+                compare_groups[key] = [path, st, 1, False] if file_hash is None else None
+                yield (path, st, "hash" if file_hash else "first", key), file_hash or key
+                continue
+            group = compare_groups[key]
+            if group is not None:
+                group[2] += 1
+                if file_hash is None and group[2] <= compare_group_limit:
+                    yield (path, st, "compare", key), None
+                    continue
+                if not group[3]:
+                    group[3] = True
+                    yield (group[0], group[1], "alias", key), None
+            yield (path, st, "hash", key), file_hash
+
+    def hash_full(item):
+        path, st, mode, key = item
+        if mode == "compare":
+            same = compare_files(compare_groups[key][0], path)
+            if same:
+                return key
+            # Differs from the first file, or one of them cannot be read (the first file was
+            # never opened) - hash it to match it against the rest of the group. Unreadable
+            # files come back as None and are skipped.
+        return get_file_hash(path, hash_func, read_mode)
+
+    def confirm_same(kept_path, path, st):
+        # Byte check of a digest match, queued on the file's device like any other read
+        if scheduler is None:
+            return compare_files(kept_path, path)
+        return scheduler.submit(lambda item: compare_files(kept_path, item[0]), (path, st)).result()
+
+    jobs = metrics.timed(full_jobs(), "cache") if cache else full_jobs()
+    results = hash_in_parallel(jobs,
+                               metrics.timed_call("hash_work", hash_full), workers, device_workers,
+                               lambda depth: metrics.peak("hash_queue", depth), scheduler)
+    for (path, st, mode, key), file_hash, computed in metrics.timed(results, "hash"):
+        if cancel_event.is_set():
+            logging.warning("Process cancelled by user.")
+            return duplicate_count, skipped_count
+
+        # Digests are strings; a compared file matching its group's first file gets the group key
+        digest = file_hash if isinstance(file_hash, str) else None
+        if computed:
+            if mode == "compare":
+                compared += 1
+                metrics.count("compared")
+            if digest:
+                full_hashed += 1
+                metrics.count("full_reads")
+                metrics.count("full_bytes", st.st_size)
+                if cache:
+                    cache.put(path, st, algorithm, "full", digest)
+
+        if mode == "alias":
+            # The first file's digest, now that its group has outgrown comparing
+            if digest:
+                if file_hashes.get(digest) is None:
+                    file_hashes.put(digest, *file_hashes.get(key))
+            continue
+
+        processed += 1
+        if not file_hash:
+            skipped_count += 1
+            continue
+
+        kept_path, kept_st = file_hashes.get(file_hash) or (None, None)
+        if kept_path and digest and compare_mode == "exact" and not confirm_same(kept_path, path, st):
+            # Same digest, different bytes (or unreadable) - never act on a hash match alone
+            logging.warning(f"Digest matches but content differs: {path} ≠ {kept_path}. Skipped.")
+            skipped_count += 1
+        elif kept_st and st.st_ino and (st.st_dev, st.st_ino) == (kept_st.st_dev, kept_st.st_ino) \
+                and st.st_nlink == 1:
+            # One file reached through two paths (e.g. a bind mount), not a copy
+            logging.info(f"Same file seen twice: {path} = {kept_path}. Skipped.")
+            skipped_count += 1
+        elif kept_path:
+            # duplicate found
+            if duplicate_callback:
+                stage = metrics.switch("report")
+                duplicate_callback(path, st, kept_path, kept_st, digest)
+                metrics.switch(stage)
+            if dry_run:
+                logging.info(f"Duplicate found: {path} = {kept_path}")
+                journal.record("found", path, st.st_size, digest, kept_path)
+                duplicate_count += 1
+            else:
+                stage = metrics.switch("act")
+                outcome = act_on_duplicate(action, path, st.st_size, digest, kept_path, directory,
+                                           backup_dir, preserve_structure, journal, store)
+                metrics.switch(stage)
+                if outcome == "ok":
+                    duplicate_count += 1
+                elif outcome == "skipped":
+                    skipped_count += 1
+        else:
+            file_hashes.put(file_hash, path, st)
+            distinct += 1
+
+        report(path)
+
+    if cancel_event.is_set():
+        logging.warning("Process cancelled by user.")
+        return duplicate_count, skipped_count
+    if discovered == 0:
+        logging.warning("No files found in the selected folders.")
+        return 0, 0
+
+    unique = size_table.held_sizes()
+    pruned = sample_table.held_sizes()
+    partial_saved = sum(size - sampled for size in pruned if size > sampled)
+    processed = discovered
+    report()
+    metrics.counters.update(unique_size=len(unique), sample_pruned=len(pruned), distinct=distinct,
+                            folders_pruned=rules.pruned_dirs, files_excluded=rules.skipped_files,
+                            bytes_not_read=sum(unique) + partial_saved)
+
+    if rules.pruned_dirs or rules.skipped_files:
+        logging.info(f"Scan rules: {rules.pruned_dirs} folders pruned, {rules.skipped_files} files skipped.")
+    logging.info(f"Stage 1 (size): {len(unique)} unique-size files pruned "
+                 f"({format_size(sum(unique))} not read), {empty_count} empty files ignored.")
+    logging.info(f"Stage 2 (sample digest): {len(pruned)} files pruned "
+                 f"({format_size(partial_saved)} not read).")
+    logging.info(f"Stage 3 (full hash): {full_hashed} files read in full, {compared} compared "
+                 f"byte by byte, {distinct} distinct contents kept.")
+    if dry_run:
+        logging.info(f"Total {duplicate_count} duplicates found, {skipped_count} skipped.")
+    else:
+        logging.info(f"Total {duplicate_count} duplicates deleted, {skipped_count} skipped.")
+    return duplicate_count, skipped_count
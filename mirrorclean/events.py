@@ -0,0 +1,49 @@
+import logging
+import threading
+from collections import deque
+
+# Log lines waiting for the UI; older lines are dropped (they are still in the log file)
+LOG_QUEUE_LIMIT = 5000
+
+# --- Event channel between the engine thread and a UI thread ---
+class EventChannel:
+    # The engine only records the latest progress/status and queues log lines. The UI thread
+    # drains the channel on its own timer, so 500k files never mean 500k UI updates.
+    def __init__(self, max_log_lines=LOG_QUEUE_LIMIT):
+        self.lock = threading.Lock()
+        self.progress = None
+        self.status = None
+        self.log_lines = deque(maxlen=max_log_lines)
+        self.dropped = 0
+
+    def progress_callback(self, processed, discovered):
+        self.progress = (processed, discovered)
+
+    def status_callback(self, current_file):
+        self.status = current_file
+
+    def add_log(self, levelno, msg):
+        with self.lock:
+            if len(self.log_lines) == self.log_lines.maxlen:
+                self.dropped += 1
+            self.log_lines.append((levelno, msg))
+
+    def drain(self):
+        # Returns (progress, status, log lines, dropped line count); progress and status are
+        # the latest values and are not reset, so the caller skips redraws when unchanged.
+        with self.lock:
+            lines, dropped = list(self.log_lines), self.dropped
+            self.log_lines.clear()
+            self.dropped = 0
+        return self.progress, self.status, lines, dropped
+
+class ChannelHandler(logging.Handler):
+    def __init__(self, channel):
+        super().__init__()
+        self.channel = channel
+
+    def emit(self, record):
+        try:
+            self.channel.add_log(record.levelno, self.format(record))
+        except Exception:
+            self.handleError(record)
@@ -0,0 +1,719 @@
+import os
+import re
+import time
+import logging
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from .hashing import (
+    XXHASH_ALGORITHM, READ_MODES, DEFAULT_READ_MODE, DEFAULT_HASH_WORKERS, COMPARE_MODES,
+    DEFAULT_COMPARE_MODE, COMPARE_GROUP_LIMIT, cancel_event, get_hash_algorithm, find_hash_algorithm,
+    xxhash
+)
+from .cache import compact_hash_cache
+from .actions import ACTION_MODES, DEFAULT_ACTION
+from .scanner import ScanRules
+from .engine import BACKUP_DIR_NAME, LOG_DIR_NAME, remove_duplicate_files
+from .events import EventChannel, ChannelHandler
+from .metrics import RunMetrics
+from .checkpoint import load_checkpoint, describe_checkpoint, checkpoint_options
+
+# Colors - Modern Professional Theme
+PRIMARY_COLOR = "#1a73e8"     # Google Blue
+SECONDARY_COLOR = "#424242"   # Dark Grey
+ACCENT_COLOR = "#2196f3"      # Material Blue
+SUCCESS_COLOR = "#00c853"     # Material Green
+WARNING_COLOR = "#ffd600"     # Material Yellow
+ERROR_COLOR = "#f44336"       # Material Red
+INFO_COLOR = "#569cd6"        # Info Blue
+BG_COLOR = "#f8f9fa"          # Light Grey Background
+TEXT_COLOR = "#202124"        # Near Black
+BORDER_COLOR = "#e0e0e0"      # Light Border
+CARD_BG = "#ffffff"           # White for Cards
+HOVER_COLOR = "#f1f3f4"       # Hover state
+
+# GUI refresh - progress and log lines are drawn at most this often
+UI_UPDATES_PER_SEC = 10
+LOG_MAX_LINES = 1000  # the activity log keeps only the most recent lines
+
+LOG_PREFIXES = {
+    logging.WARNING: ("⚠️ ", "warning"),
+    logging.ERROR: ("❌ ", "error")
+}
+
+# Create tooltip class
+class ToolTip:
+    def __init__(self, widget, text):
+        self.widget = widget
+        self.text = text
+        self.tooltip = None
+        self.widget.bind('<Enter>', self.enter)
+        self.widget.bind('<Leave>', self.leave)
+
+    def enter(self, event=None):
+        x, y, _, _ = self.widget.bbox("insert")
+        x += self.widget.winfo_rootx() + 25
+        y += self.widget.winfo_rooty() + 25
+        
+        self.tooltip = tk.Toplevel(self.widget)
+        self.tooltip.wm_overrideredirect(True)
+        self.tooltip.wm_geometry(f"+{x}+{y}")
+        
+        label = ttk.Label(self.tooltip, text=self.text, style='ToolTip.TLabel')
+        label.pack()
+
+    def leave(self, event=None):
+        if self.tooltip:
+            self.tooltip.destroy()
+            self.tooltip = None
+
+# Style
+
+def create_custom_style():
+    style = ttk.Style()
+    style.theme_use('clam')
+    
+    # Common styles
+    style.configure('TFrame', background=CARD_BG)
+    style.configure('App.TFrame', background=BG_COLOR)
+    
+    # Labels
+    style.configure('TLabel', 
+                   background=CARD_BG,
+                   foreground=TEXT_COLOR, 
+                   font=('Segoe UI', 10))
+    style.configure('Header.TLabel',
+                   background=BG_COLOR,
+                   foreground=PRIMARY_COLOR,
+                   font=('Segoe UI', 18, 'bold'))
+    style.configure('Subheader.TLabel',
+                   background=BG_COLOR,
+                   foreground=SECONDARY_COLOR,
+                   font=('Segoe UI', 12))
+    
+    # Buttons
+    button_common = {
+        'font': ('Segoe UI', 10, 'bold'),
+        'borderwidth': 0,
+        'relief': 'flat',
+        'padding': (10, 6)  # More compact padding
+    }
+    
+    style.configure('Primary.TButton',
+                   **button_common,
+                   background=PRIMARY_COLOR,
+                   foreground='white')
+    style.map('Primary.TButton',
+              background=[('active', ACCENT_COLOR), ('pressed', ACCENT_COLOR)],
+              relief=[('pressed', 'flat')],
+              borderwidth=[('active', 0), ('pressed', 0)])
+    
+    style.configure('Secondary.TButton',
+                   **button_common,
+                   background=SECONDARY_COLOR,
+                   foreground='white')
+    style.map('Secondary.TButton',
+              background=[('active', '#616161'), ('pressed', '#616161')],
+              relief=[('pressed', 'flat')],
+              borderwidth=[('active', 0), ('pressed', 0)])
+    
+    # Entry fields
+    style.configure('TEntry',
+                   fieldbackground='white',
+                   background='white',
+                   borderwidth=1,
+                   relief='solid',
+                   font=('Segoe UI', 10),
+                   padding=3)  # More compact padding
+    
+    # Frames and cards
+    style.configure('Card.TLabelframe',
+                   background=CARD_BG,
+                   foreground=TEXT_COLOR,
+                   font=('Segoe UI', 11, 'bold'),
+                   borderwidth=1,
+                   relief='solid')
+    style.configure('Card.TLabelframe.Label',
+                   background=CARD_BG,
+                   foreground=TEXT_COLOR,
+                   font=('Segoe UI', 11, 'bold'))
+    
+    # Progress bar - more compact
+    style.configure('Yellow.Horizontal.TProgressbar',
+                   troughcolor='#f5f5f5',
+                   background=WARNING_COLOR,
+                   bordercolor=BORDER_COLOR,
+                   lightcolor=WARNING_COLOR,
+                   darkcolor=WARNING_COLOR,
+                   thickness=6)  # Thinner progress bar
+    
+    style.configure('Green.Horizontal.TProgressbar',
+                   troughcolor='#f5f5f5',
+                   background=SUCCESS_COLOR,
+                   bordercolor=BORDER_COLOR,
+                   lightcolor=SUCCESS_COLOR,
+                   darkcolor=SUCCESS_COLOR,
+                   thickness=6)  # Thinner progress bar
+                   
+    # Tooltips style - new
+    style.configure('ToolTip.TLabel',
+                   background='#333333',
+                   foreground='white',
+                   font=('Segoe UI', 9),
+                   padding=4)
+    
+    return style
+
+def main():
+    running = {"thread": None}
+
+    # --- GUI Functions ---
+    def select_folder():
+        folder_selected = filedialog.askdirectory()
+        if folder_selected:
+            txt_folder_path.delete(0, tk.END)
+            txt_folder_path.insert(0, folder_selected)
+
+    def add_folder():
+        # Further roots go after the first, separated like PATH entries
+        folder_selected = filedialog.askdirectory()
+        if folder_selected:
+            if txt_folder_path.get().strip():
+                txt_folder_path.insert(tk.END, os.pathsep)
+            txt_folder_path.insert(tk.END, folder_selected)
+
+    def get_folders():
+        return [folder.strip() for folder in txt_folder_path.get().split(os.pathsep) if folder.strip()]
+
+    def start_process(resume_options=None):
+        # resume_options: remove_duplicate_files keywords of an interrupted run (checkpoint_options)
+        cancel_event.clear()
+
+        folders = get_folders()
+        if not folders or not all(os.path.isdir(folder) for folder in folders):
+            messagebox.showerror("Error", "Please select a valid folder")
+            return
+        source_dir = folders[0]
+        log_dir = os.path.join(source_dir, LOG_DIR_NAME)
+
+        if resume_options:
+            # Everything the interrupted run used, including options the window has no field for
+            options = dict(resume_options, resume=True)
+            log_dir = options.pop("log_dir", log_dir)
+        else:
+            try:
+                workers = max(1, int(hash_workers.get()))
+            except (tk.TclError, ValueError):
+                workers = DEFAULT_HASH_WORKERS
+            patterns = [pattern.strip() for pattern in exclude_patterns.get().split(",") if pattern.strip()]
+            try:
+                scan_rules = ScanRules(exclude=patterns)
+            except re.error as e:
+                messagebox.showerror("Error", f"Invalid exclude pattern: {e}")
+                return
+            options = {
+                "directory": folders,
+                "backup_dir": os.path.join(source_dir, BACKUP_DIR_NAME),
+                "hash_func": get_hash_algorithm(hash_choice.get()),
+                "preserve_structure": preserve_structure.get(),
+                "include_empty": include_empty_files.get(),
+                "use_cache": use_hash_cache.get(),
+                "workers": workers,
+                "read_mode": read_mode.get(),
+                "action": duplicate_action.get(),
+                "compare_mode": compare_mode.get(),
+                "scan_rules": scan_rules
+            }
+        dry_run = options.get("dry_run", False)
+
+        btn_start.config(state=tk.DISABLED)
+        btn_resume.config(state=tk.DISABLED)
+        btn_browse.config(state=tk.DISABLED)
+        btn_add.config(state=tk.DISABLED)
+        btn_compact.config(state=tk.DISABLED)  # the scan writes to the same cache
+        btn_cancel.config(state=tk.NORMAL)
+        progress_var.set(0)
+        lbl_status.config(text="Scanning for duplicates (report only)..." if dry_run else "Scanning for duplicates...")
+
+        channel = EventChannel()
+        metrics = RunMetrics()
+        drawn = {"progress": None, "status": None, "running": True}
+
+        def pump_events():
+            # Runs on the Tk thread: draw whatever the engine produced since the last tick
+            started = time.perf_counter()
+            progress, status, lines, dropped = channel.drain()
+            if progress is not None and progress != drawn["progress"]:
+                processed, discovered = drawn["progress"] = progress
+                progress_var.set(int(processed / discovered * 100) if discovered else 0)
+                lbl_progress.config(text=f"{processed:,} processed / {discovered:,} found")
+            if status is not None and status != drawn["status"] and drawn["running"]:
+                drawn["status"] = status
+                lbl_status.config(text=f"Processing: {status}...")
+            if lines or dropped:
+                append_log(lines, dropped)
+            lbl_stats.config(text=metrics.summary())
+            metrics.add_time("ui", time.perf_counter() - started)
+            if drawn["running"]:
+                root.after(1000 // UI_UPDATES_PER_SEC, pump_events)
+
+        def finish(duplicates_deleted, skipped):
+            drawn["running"] = False
+            pump_events()
+            if dry_run:
+                lbl_status.config(text=f"Completed! {duplicates_deleted} duplicates found (nothing changed), "
+                                       f"{skipped} skipped.")
+            else:
+                lbl_status.config(text=f"Completed! {duplicates_deleted} duplicates removed, {skipped} skipped.")
+            btn_start.config(state=tk.NORMAL)
+            btn_resume.config(state=tk.NORMAL)
+            btn_browse.config(state=tk.NORMAL)
+            btn_add.config(state=tk.NORMAL)
+            btn_compact.config(state=tk.NORMAL)
+            btn_cancel.config(state=tk.DISABLED)
+
+        def worker():
+            duplicates_deleted, skipped = remove_duplicate_files(
+                log_dir=log_dir,
+                progress_callback=channel.progress_callback,
+                status_callback=channel.status_callback,
+                log_handler=ChannelHandler(channel),
+                metrics=metrics,
+                **options
+            )
+            root.after(0, lambda: finish(duplicates_deleted, skipped))
+
+        running["thread"] = threading.Thread(target=worker, daemon=True)
+        running["thread"].start()
+        pump_events()
+
+    def resume_process():
+        # Restore the interrupted scan's folders and options, then continue it
+        folders = get_folders()
+        if not folders or not os.path.isdir(folders[0]):
+            messagebox.showerror("Error", "Please select a valid folder")
+            return
+        log_dir = os.path.join(folders[0], LOG_DIR_NAME)
+        state = load_checkpoint(log_dir)
+        if state is None:
+            messagebox.showinfo("Resume", "There is no interrupted scan to resume for this folder.")
+            return
+        try:
+            resume_options = checkpoint_options(state)
+        except (KeyError, ValueError, re.error) as e:
+            messagebox.showerror("Resume", f"The interrupted scan cannot be resumed: {e}")
+            return
+        options = state["options"]
+        mode = ("It only reports duplicates and changes nothing." if options.get("dry_run") else
+                f"Duplicates will be handled with the {options['action']} action.")
+        if not messagebox.askyesno("Resume", f"Resume the {describe_checkpoint(state)}?\n{mode}"):
+            return
+        hash_choice.set(find_hash_algorithm(options["algorithm"]))
+        txt_folder_path.delete(0, tk.END)
+        txt_folder_path.insert(0, os.pathsep.join(options["roots"]))
+        preserve_structure.set(options["preserve_structure"])
+        include_empty_files.set(options["include_empty"])
+        use_hash_cache.set(options["use_cache"])
+        hash_workers.set(options["workers"])
+        read_mode.set(options["read_mode"])
+        duplicate_action.set(options["action"])
+        compare_mode.set(options["compare_mode"])
+        exclude_patterns.set(", ".join((options.get("scan_rules") or {}).get("exclude", [])))
+        start_process(dict(resume_options, log_dir=log_dir))
+
+    def close_window():
+        # Let a running scan write its checkpoint before the window goes away
+        thread = running["thread"]
+        if thread is None or not thread.is_alive():
+            root.destroy()
+            return
+        cancel_event.set()
+        lbl_status.config(text="Saving progress before closing...")
+        root.after(100, close_window)
+
+    def cancel_process():
+        cancel_event.set()
+        lbl_status.config(text="Cancelling... Please wait.")
+
+    def compact_cache():
+        folders = get_folders()
+        if not folders or not os.path.isdir(folders[0]):
+            messagebox.showerror("Error", "Please select a valid folder")
+            return
+        source_dir = folders[0]
+
+        # No scan may start while VACUUM holds the cache
+        for button in (btn_compact, btn_start, btn_resume):
+            button.config(state=tk.DISABLED)
+        lbl_status.config(text="Compacting hash cache...")
+
+        def worker():
+            try:
+                removed = compact_hash_cache(os.path.join(source_dir, LOG_DIR_NAME))
+                message = f"Hash cache compacted, {removed} stale entries removed."
+            except Exception as e:
+                message = f"Cannot compact hash cache: {e}"
+            root.after(0, done, message)
+
+        def done(message):
+            lbl_status.config(text=message)
+            for button in (btn_compact, btn_start, btn_resume):
+                button.config(state=tk.NORMAL)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def append_log(lines, dropped):
+        # One insert per line batch, then trim the widget back to LOG_MAX_LINES
+        verbose = verbose_mode.get()
+        log_text.config(state=tk.NORMAL)
+        if dropped:
+            log_text.insert(tk.END, f"⚠️ {dropped} log lines not shown, see the log file\n", "warning")
+        for levelno, msg in lines:
+            if not verbose and levelno == logging.INFO:
+                continue  # skip detailed logs if summary mode
+            prefix, tag = LOG_PREFIXES.get(levelno, ("ℹ️ ", ()))
+            log_text.insert(tk.END, prefix + msg + "\n", tag)
+        line_count = int(log_text.index("end-1c").split(".")[0])
+        if line_count > LOG_MAX_LINES:
+            log_text.delete("1.0", f"{line_count - LOG_MAX_LINES}.0")
+        log_text.see(tk.END)
+        log_text.config(state=tk.DISABLED)
+
+    def clear_log():
+        log_text.config(state=tk.NORMAL)
+        log_text.delete("1.0", tk.END)
+        log_text.config(state=tk.DISABLED)
+
+    # --- GUI Layout ---
+    root = tk.Tk()
+    root.title("Duplicate File Remover")
+    root.geometry("800x650")  # More compact window
+    root.resizable(True, True)
+
+    style = create_custom_style()
+
+    root.option_add("*TButton*Cursor", "hand2")
+    root.option_add("*TButton*BorderWidth", 0)
+    root.option_add("*TEntry*BorderWidth", 2)
+    root.option_add("*TEntry*Relief", "flat")
+
+    root.configure(background=BG_COLOR)
+
+    main_frame = ttk.Frame(root, padding=15, style='App.TFrame')
+    main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+
+    # Header - more compact
+    header_frame = ttk.Frame(main_frame)
+    header_frame.pack(fill=tk.X, pady=(0, 15))
+    ttk.Label(header_frame, text="🔍 Duplicate File Remover", style='Header.TLabel',
+              background=BG_COLOR).pack(anchor=tk.CENTER, pady=(0, 2))
+    ttk.Label(header_frame, text="Scan and remove duplicate files efficiently", 
+              style='Subheader.TLabel', background=BG_COLOR).pack(anchor=tk.CENTER)
+
+    # Folder selection - more compact
+    folder_frame = ttk.LabelFrame(main_frame, text="Folder Selection", padding=10, style='Card.TLabelframe')
+    folder_frame.pack(fill=tk.X, pady=(0, 15))
+    folder_grid = ttk.Frame(folder_frame)
+    folder_grid.pack(fill=tk.X)
+    ttk.Label(folder_grid, text="Source Folder:", style='TLabel').grid(row=0, column=0, padx=(0, 10), pady=5, sticky=tk.W)
+    txt_folder_path = ttk.Entry(folder_grid, width=50, font=('Segoe UI', 10))
+    txt_folder_path.grid(row=0, column=1, padx=(0, 10), pady=5, sticky=tk.EW)
+    btn_browse = ttk.Button(folder_grid, text="📂 Browse", command=select_folder, style='Secondary.TButton')
+    btn_browse.grid(row=0, column=2, padx=5, pady=5)
+    btn_add = ttk.Button(folder_grid, text="➕ Add", command=add_folder, style='Secondary.TButton')
+    btn_add.grid(row=0, column=3, padx=5, pady=5)
+    ToolTip(btn_add, "Add another folder - duplicates are found across all of them")
+    folder_grid.columnconfigure(1, weight=1)
+
+    # Options - more compact with tooltips
+    options_frame = ttk.LabelFrame(main_frame, text="Options", padding=10, style='Card.TLabelframe')
+    options_frame.pack(fill=tk.X, pady=(0, 15))
+    hash_choice = tk.StringVar(value="Secure (SHA256)")
+    preserve_structure = tk.BooleanVar(value=False)
+    verbose_mode = tk.BooleanVar(value=True)
+    include_empty_files = tk.BooleanVar(value=False)
+    use_hash_cache = tk.BooleanVar(value=True)
+    hash_workers = tk.IntVar(value=DEFAULT_HASH_WORKERS)
+    read_mode = tk.StringVar(value=DEFAULT_READ_MODE)
+    duplicate_action = tk.StringVar(value=DEFAULT_ACTION)
+    compare_mode = tk.StringVar(value=DEFAULT_COMPARE_MODE)
+    exclude_patterns = tk.StringVar(value="")
+
+    # Hash Algorithm section - horizontal layout
+    options_grid = ttk.Frame(options_frame)
+    options_grid.pack(fill=tk.X, padx=5, pady=5)
+
+    hash_label = ttk.Label(options_grid, text="Hash Algorithm:", style='TLabel')
+    hash_label.pack(side=tk.LEFT, padx=(0, 10))
+
+    hash_frame = ttk.Frame(options_grid)
+    hash_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    rb_md5 = tk.Radiobutton(hash_frame, 
+                            text="🚀 MD5 (Fast)", 
+                            variable=hash_choice, 
+                            value="Fast (MD5)", 
+                            bg=CARD_BG, 
+                            font=('Segoe UI', 10),
+                            cursor="hand2")
+    rb_md5.pack(side=tk.LEFT, padx=(0, 15))
+    ToolTip(rb_md5, "Faster but less secure hash algorithm")
+
+    rb_sha = tk.Radiobutton(hash_frame, 
+                            text="🔒 SHA256 (Secure)", 
+                            variable=hash_choice, 
+                            value="Secure (SHA256)", 
+                            bg=CARD_BG, 
+                            font=('Segoe UI', 10),
+                            cursor="hand2")
+    rb_sha.pack(side=tk.LEFT, padx=(0, 15))
+    ToolTip(rb_sha, "More secure but slower hash algorithm")
+
+    rb_blake = tk.Radiobutton(hash_frame, 
+                              text="⚖ BLAKE2b", 
+                              variable=hash_choice, 
+                              value="Balanced (BLAKE2b)", 
+                              bg=CARD_BG, 
+                              font=('Segoe UI', 10),
+                              cursor="hand2")
+    rb_blake.pack(side=tk.LEFT, padx=(0, 15))
+    ToolTip(rb_blake, "Cryptographic hash, faster than SHA256 on CPUs without SHA extensions")
+
+    rb_xxhash = tk.Radiobutton(hash_frame, 
+                               text="⚡ xxHash3", 
+                               variable=hash_choice, 
+                               value=XXHASH_ALGORITHM, 
+                               bg=CARD_BG, 
+                               font=('Segoe UI', 10),
+                               cursor="hand2",
+                               state=tk.NORMAL if xxhash else tk.DISABLED)
+    rb_xxhash.pack(side=tk.LEFT)
+    ToolTip(rb_xxhash, "Fastest non-cryptographic hash" if xxhash else "Install the xxhash package to enable")
+
+    workers_spin = ttk.Spinbox(options_grid, 
+                              from_=1, 
+                              to=64, 
+                              width=4, 
+                              textvariable=hash_workers, 
+                              font=('Segoe UI', 10))
+    workers_spin.pack(side=tk.RIGHT)
+    ttk.Label(options_grid, text="Workers:", style='TLabel').pack(side=tk.RIGHT, padx=(10, 5))
+    ToolTip(workers_spin, "Files hashed in parallel per disk (spinning disks get 1)")
+
+    read_mode_box = ttk.Combobox(options_grid, 
+                                values=READ_MODES, 
+                                textvariable=read_mode, 
+                                state="readonly", 
+                                width=9, 
+                                font=('Segoe UI', 10))
+    read_mode_box.pack(side=tk.RIGHT)
+    ttk.Label(options_grid, text="Read:", style='TLabel').pack(side=tk.RIGHT, padx=(10, 5))
+    ToolTip(read_mode_box, "buffered: classic 8 KB reads, readinto: reused adaptive buffer, mmap: map files over 64 MB")
+
+    # Duplicate action row
+    action_grid = ttk.Frame(options_frame)
+    action_grid.pack(fill=tk.X, padx=5, pady=5)
+
+    ttk.Label(action_grid, text="Duplicate Action:", style='TLabel').pack(side=tk.LEFT, padx=(0, 10))
+    action_box = ttk.Combobox(action_grid, 
+                             values=ACTION_MODES, 
+                             textvariable=duplicate_action, 
+                             state="readonly", 
+                             width=10, 
+                             font=('Segoe UI', 10))
+    action_box.pack(side=tk.LEFT)
+    ToolTip(action_box, "copy/move: back up then remove, hardlink/reflink: replace with a link to the kept file, "
+                        "store: keep each distinct content once in the backup folder's store")
+
+    ttk.Label(action_grid, text="Exclude:", style='TLabel').pack(side=tk.LEFT, padx=(10, 5))
+    exclude_entry = ttk.Entry(action_grid, 
+                              textvariable=exclude_patterns, 
+                              width=24, 
+                              font=('Segoe UI', 10))
+    exclude_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    ToolTip(exclude_entry, "Comma separated patterns such as .git, node_modules, *.tmp; "
+                           "excluded folders are never entered")
+
+    compare_box = ttk.Combobox(action_grid, 
+                              values=COMPARE_MODES, 
+                              textvariable=compare_mode, 
+                              state="readonly", 
+                              width=8, 
+                              font=('Segoe UI', 10))
+    compare_box.pack(side=tk.RIGHT)
+    ttk.Label(action_grid, text="Match:", style='TLabel').pack(side=tk.RIGHT, padx=(10, 5))
+    ToolTip(compare_box, f"hash: digest every file, compare: check groups of up to {COMPARE_GROUP_LIMIT} "
+                         "files byte by byte, exact: also confirm every digest match byte by byte")
+
+    # Checkbuttons in a separate frame
+    check_frame = ttk.Frame(options_frame)
+    check_frame.pack(fill=tk.X, padx=5, pady=5)
+
+    preserve_check = ttk.Checkbutton(check_frame, 
+                                    text="📁 Preserve structure",
+                                    variable=preserve_structure,
+                                    style='TCheckbutton',
+                                    cursor="hand2")
+    preserve_check.pack(side=tk.LEFT, padx=(0, 20))
+    ToolTip(preserve_check, "Maintain folder hierarchy in backup location")
+
+    verbose_check = ttk.Checkbutton(check_frame, 
+                                   text="📝 Verbose logging",
+                                   variable=verbose_mode,
+                                   style='TCheckbutton',
+                                   cursor="hand2")
+    verbose_check.pack(side=tk.LEFT, padx=(0, 20))
+    ToolTip(verbose_check, "Show detailed operation logs")
+
+    empty_check = ttk.Checkbutton(check_frame, 
+                                 text="📄 Include empty files",
+                                 variable=include_empty_files,
+                                 style='TCheckbutton',
+                                 cursor="hand2")
+    empty_check.pack(side=tk.LEFT, padx=(0, 20))
+    ToolTip(empty_check, "Treat zero-length files as duplicates of each other")
+
+    cache_check = ttk.Checkbutton(check_frame, 
+                                 text="⚡ Use hash cache",
+                                 variable=use_hash_cache,
+                                 style='TCheckbutton',
+                                 cursor="hand2")
+    cache_check.pack(side=tk.LEFT)
+    ToolTip(cache_check, "Reuse digests of unchanged files from earlier runs")
+
+    # Action buttons - compact row
+    action_frame = ttk.Frame(main_frame, style='App.TFrame')
+    action_frame.pack(fill=tk.X, pady=(0, 15))
+
+    btn_start = ttk.Button(action_frame, 
+                          text="▶ Start",
+                          command=start_process, 
+                          style='Primary.TButton')
+    btn_start.pack(side=tk.LEFT, padx=(0, 10))
+    ToolTip(btn_start, "Start scanning and removing duplicates")
+
+    btn_resume = ttk.Button(action_frame, 
+                           text="⏯ Resume last scan",
+                           command=resume_process, 
+                           style='Secondary.TButton')
+    btn_resume.pack(side=tk.LEFT, padx=(0, 10))
+    ToolTip(btn_resume, "Continue an interrupted scan; only files changed since are hashed again")
+
+    btn_cancel = ttk.Button(action_frame, 
+                           text="⏹",
+                           command=cancel_process, 
+                           style='Secondary.TButton',
+                           state=tk.DISABLED)
+    btn_cancel.pack(side=tk.LEFT, padx=(0, 10))
+    ToolTip(btn_cancel, "Cancel the current operation")
+
+    btn_clear = ttk.Button(action_frame, 
+                          text="🗑",
+                          command=clear_log, 
+                          style='Secondary.TButton')
+    btn_clear.pack(side=tk.LEFT, padx=(0, 10))
+    ToolTip(btn_clear, "Clear the activity log")
+
+    btn_compact = ttk.Button(action_frame, 
+                            text="🧹",
+                            command=compact_cache, 
+                            style='Secondary.TButton')
+    btn_compact.pack(side=tk.LEFT)
+    ToolTip(btn_compact, "Evict stale entries from the hash cache")
+
+    # Progress section - more compact
+    progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding=10, style='Card.TLabelframe')
+    progress_frame.pack(fill=tk.X, pady=(0, 15))
+
+    # Combined progress header and bar
+    progress_container = ttk.Frame(progress_frame)
+    progress_container.pack(fill=tk.X, padx=5, pady=5)
+
+    progress_left = ttk.Frame(progress_container)
+    progress_left.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    # Progress header inline with bar
+    progress_header = ttk.Frame(progress_left)
+    progress_header.pack(fill=tk.X, pady=(0, 3))
+    ttk.Label(progress_header, text="📊 Scan Progress:", style='TLabel').pack(side=tk.LEFT)
+    lbl_progress = ttk.Label(progress_header, text="0%", style='TLabel', font=('Segoe UI', 10, 'bold'))
+    lbl_progress.pack(side=tk.RIGHT)
+
+    # Compact progress bar
+    progress_var = tk.IntVar()
+    progress_bar = ttk.Progressbar(progress_left, 
+                                 orient="horizontal", 
+                                 mode="determinate",
+                                 variable=progress_var, 
+                                 style="Yellow.Horizontal.TProgressbar")
+    progress_bar.pack(fill=tk.X)
+
+    # Status - inline
+    status_frame = ttk.Frame(progress_container)
+    status_frame.pack(side=tk.RIGHT, padx=(10, 0))
+    ttk.Label(status_frame, text="📝", style='TLabel').pack(side=tk.LEFT)
+    lbl_status = ttk.Label(status_frame, 
+                          text="Ready to scan",
+                          font=('Segoe UI', 10, 'italic'),
+                          foreground=SECONDARY_COLOR)
+    lbl_status.pack(side=tk.LEFT, padx=(5, 0))
+
+    # Stage timers and counters of the current run
+    lbl_stats = ttk.Label(progress_frame, 
+                         text="", 
+                         font=('Segoe UI', 9),
+                         foreground=SECONDARY_COLOR,
+                         justify=tk.LEFT)
+    lbl_stats.pack(fill=tk.X, padx=5)
+
+    # Log frame with modern, compact styling
+    log_frame = ttk.LabelFrame(main_frame, text="Activity Log", padding=10, style='Card.TLabelframe')
+    log_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+
+    # Create a container frame for the log
+    log_container = ttk.Frame(log_frame)
+    log_container.pack(fill=tk.BOTH, expand=True)
+
+    # Text widget with modern styling - reduced height
+    log_text = tk.Text(log_container, 
+                      height=10,  # Reduced height for compactness
+                      wrap=tk.WORD, 
+                      state=tk.DISABLED,
+                      bg="#e1e1e1",  # VS Code-like dark background
+                      fg="#000000",  # Light gray text
+                      insertbackground="white",
+                      font=('Cascadia Code', 10),  # Modern monospace font
+                      padx=10,
+                      pady=10,
+                      relief='flat',
+                      borderwidth=0)
+
+    # Modern scrollbar styling
+    log_scroll = ttk.Scrollbar(log_container, 
+                              orient=tk.VERTICAL, 
+                              command=log_text.yview)
+    log_text.configure(yscrollcommand=log_scroll.set)
+
+    # Pack scrollbar and text
+    log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    # Configure log message styles with updated colors
+    log_text.tag_config("warning", foreground=WARNING_COLOR)
+    log_text.tag_config("error", foreground=ERROR_COLOR)
+    log_text.tag_config("info", foreground=INFO_COLOR)
+
+    # Compact footer with helpful note
+    footer_frame = ttk.Frame(main_frame, style='App.TFrame')
+    footer_frame.pack(fill=tk.X, pady=(5, 0))
+
+    footer_text = "💡 Duplicate files are safely moved to a backup folder"
+    ttk.Label(footer_frame, 
+             text=footer_text,
+             font=('Segoe UI', 9),
+             foreground=SECONDARY_COLOR,
+             background=BG_COLOR).pack(anchor=tk.CENTER, pady=(0, 2))
+
+    root.protocol("WM_DELETE_WINDOW", close_window)
+    root.mainloop()
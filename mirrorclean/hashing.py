@@ -0,0 +1,322 @@
+import os
+import hashlib
+import logging
+import threading
+import mmap
+import functools
+from collections import deque, Counter
+
+from .devices import DEVICE_LOOKAHEAD, DeviceScheduler
+
+try:
+    import xxhash  # optional - enables the xxHash3 algorithm
+except ImportError:
+    xxhash = None
+
+# --- Settings ---
+BLAKE2B_DIGEST_SIZE = 32  # bytes, 1-64
+
+HASH_ALGORITHMS = {
+    "Fast (MD5)": hashlib.md5,
+    "Secure (SHA256)": hashlib.sha256,
+    "Balanced (BLAKE2b)": functools.partial(hashlib.blake2b, digest_size=BLAKE2B_DIGEST_SIZE)
+}
+XXHASH_ALGORITHM = "Fastest (xxHash3)"
+FALLBACK_ALGORITHM = "Balanced (BLAKE2b)"
+if xxhash is not None:
+    HASH_ALGORITHMS[XXHASH_ALGORITHM] = xxhash.xxh3_128
+
+# Short names accepted on the command line
+ALGORITHM_ALIASES = {
+    "md5": "Fast (MD5)",
+    "sha256": "Secure (SHA256)",
+    "blake2b": "Balanced (BLAKE2b)",
+    "xxh3": XXHASH_ALGORITHM
+}
+
+# Partial hash sampling - block sizes in bytes
+PARTIAL_HASH_SETTINGS = {
+    "head_size": 64 * 1024,
+    "tail_size": 64 * 1024,
+    "sample_count": 3,
+    "sample_size": 16 * 1024
+}
+
+# File read path - "buffered" is the plain f.read(8192) loop, "readinto" reuses one
+# buffer per thread, "mmap" maps large files. Chunk size grows with file size.
+READ_MODES = ("buffered", "readinto", "mmap")
+DEFAULT_READ_MODE = "readinto"
+READ_CHUNK_MIN = 64 * 1024
+READ_CHUNK_MAX = 4 * 1024 * 1024
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Matching same-size candidates: "hash" digests every file, "compare" checks groups of up to
+# COMPARE_GROUP_LIMIT files against their first file chunk by chunk (larger groups are hashed),
+# "exact" also confirms every digest match byte by byte, so no result relies on the hash.
+COMPARE_MODES = ("hash", "compare", "exact")
+DEFAULT_COMPARE_MODE = "hash"
+COMPARE_GROUP_LIMIT = 3
+
+# Parallel hashing - workers is the limit per device (spinning disks get one). Each device
+# queues limit * HASH_QUEUE_FACTOR jobs (at least DEVICE_LOOKAHEAD), and at most
+# HASH_PENDING_LIMIT results wait to be consumed in scan order.
+DEFAULT_HASH_WORKERS = 4
+HASH_QUEUE_FACTOR = 4
+HASH_PENDING_LIMIT = 4096
+
+# Set to stop hashing promptly; checked between chunks and between jobs
+cancel_event = threading.Event()
+
+# --- Hash algorithm registry ---
+def blake2b_hasher(digest_size=BLAKE2B_DIGEST_SIZE):
+    return functools.partial(hashlib.blake2b, digest_size=digest_size)
+
+def register_hash_algorithm(label, factory):
+    # factory() must return a hashlib-style object: update(), hexdigest(), name, digest_size
+    h = factory()
+    missing = [attr for attr in ("update", "hexdigest", "name", "digest_size") if not hasattr(h, attr)]
+    if missing:
+        raise TypeError(f"Hasher for {label} is missing: {', '.join(missing)}")
+    HASH_ALGORITHMS[label] = factory
+
+def get_hash_algorithm(label):
+    label = ALGORITHM_ALIASES.get(label, label)
+    if label in HASH_ALGORITHMS:
+        return HASH_ALGORITHMS[label]
+    if label == XXHASH_ALGORITHM:
+        logging.warning("xxhash module is not installed, falling back to BLAKE2b.")
+        return HASH_ALGORITHMS[FALLBACK_ALGORITHM]
+    raise KeyError(f"Unknown hash algorithm: {label}")
+
+def hash_algorithm_name(hash_func):
+    h = hash_func()
+    return f"{h.name}-{h.digest_size * 8}"
+
+def find_hash_algorithm(name):
+    # Registry label for a hash_algorithm_name() result, or None
+    for label, factory in HASH_ALGORITHMS.items():
+        if hash_algorithm_name(factory) == name:
+            return label
+    return None
+
+# --- Hashing function ---
+_read_buffers = threading.local()
+
+def choose_chunk_size(size):
+    # About 1/16 of the file, rounded to a power of two within [READ_CHUNK_MIN, READ_CHUNK_MAX]
+    chunk = READ_CHUNK_MIN
+    while chunk < READ_CHUNK_MAX and chunk * 16 < size:
+        chunk *= 2
+    return chunk
+
+def advise_sequential(fd):
+    # Ask the kernel for aggressive readahead; no-op where posix_fadvise is unavailable
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+def advise_dontneed(fd):
+    # Drop the pages we just read so a scan does not evict the rest of the page cache
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+def _hash_buffered(f, h):
+    while chunk := f.read(8192):
+        if cancel_event.is_set():
+            return False
+        h.update(chunk)
+    return True
+
+def _hash_readinto(f, h, size):
+    chunk_size = choose_chunk_size(size)
+    buf = getattr(_read_buffers, "buf", None)
+    if buf is None or len(buf) < chunk_size:
+        buf = _read_buffers.buf = bytearray(chunk_size)
+    view = memoryview(buf)[:chunk_size]
+    try:
+        while n := f.readinto(view):
+            if cancel_event.is_set():
+                return False
+            h.update(view[:n])
+    finally:
+        view.release()
+    return True
+
+def _hash_mmap(f, h, size):
+    chunk_size = choose_chunk_size(size)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            for offset in range(0, size, chunk_size):
+                if cancel_event.is_set():
+                    return False
+                h.update(view[offset:offset + chunk_size])
+    return True
+
+def get_file_hash(file_path, hash_func, read_mode=DEFAULT_READ_MODE):
+    h = hash_func()
+    try:
+        if read_mode == "buffered":
+            with open(file_path, "rb") as f:
+                completed = _hash_buffered(f, h)
+        else:
+            with open(file_path, "rb", buffering=0) as f:
+                fd = f.fileno()
+                size = os.fstat(fd).st_size
+                advise_sequential(fd)
+                if read_mode == "mmap" and size >= MMAP_THRESHOLD:
+                    completed = _hash_mmap(f, h, size)
+                else:
+                    completed = _hash_readinto(f, h, size)
+                advise_dontneed(fd)
+    except Exception as e:
+        logging.warning(f"Cannot read file {file_path}: {e}")
+        return None
+    return h.hexdigest() if completed else None
+
+# --- Byte-by-byte comparison ---
+def _read_full(f, view):
+    # readinto until the buffer is full or the file ends
+    total = 0
+    while total < len(view):
+        n = f.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+def compare_files(path_a, path_b):
+    # Reads both files in lockstep and stops at the first differing chunk - no digest is
+    # computed. Returns True/False, or None when a file cannot be read or the scan is cancelled.
+    try:
+        with open(path_a, "rb", buffering=0) as fa, open(path_b, "rb", buffering=0) as fb:
+            size = os.fstat(fa.fileno()).st_size
+            if os.fstat(fb.fileno()).st_size != size:
+                return False
+            chunk_size = choose_chunk_size(size)
+            buffers = getattr(_read_buffers, "compare", None)
+            if buffers is None or len(buffers[0]) < chunk_size:
+                buffers = _read_buffers.compare = (bytearray(chunk_size), bytearray(chunk_size))
+            buf_a, buf_b = buffers
+            chunk_size = len(buf_a)  # a larger buffer left from an earlier file just reads more at once
+            advise_sequential(fa.fileno())
+            advise_sequential(fb.fileno())
+            with memoryview(buf_a) as view_a, memoryview(buf_b) as view_b:
+                while True:
+                    if cancel_event.is_set():
+                        return None
+                    n = _read_full(fa, view_a)
+                    if _read_full(fb, view_b) != n:
+                        return False
+                    if n == chunk_size:
+                        same = buf_a == buf_b  # whole-buffer compare is a memcmp, slices would copy
+                    else:
+                        same = buf_a[:n] == buf_b[:n]
+                    if not same:
+                        return False
+                    if n < chunk_size:
+                        break
+            # The first file is usually compared again, so only the second leaves the page cache
+            advise_dontneed(fb.fileno())
+    except Exception as e:
+        logging.warning(f"Cannot compare {path_a} and {path_b}: {e}")
+        return None
+    return True
+
+# --- Partial hashing (head, tail and sampled middle blocks) ---
+def get_sample_ranges(size, head_size, tail_size, sample_count, sample_size):
+    # Returns the (offset, length) blocks to read, or None when they would cover the whole file
+    if size <= head_size + tail_size + sample_count * sample_size:
+        return None
+    ranges = [(0, head_size)]
+    middle = size - head_size - tail_size
+    for i in range(1, sample_count + 1):
+        offset = head_size + middle * i // (sample_count + 1) - sample_size // 2
+        ranges.append((max(head_size, offset), sample_size))
+    ranges.append((size - tail_size, tail_size))
+    return ranges
+
+def get_partial_hash(file_path, hash_func, size, head_size, tail_size, sample_count, sample_size,
+                     read_mode=DEFAULT_READ_MODE):
+    ranges = get_sample_ranges(size, head_size, tail_size, sample_count, sample_size)
+    if ranges is None:
+        return get_file_hash(file_path, hash_func, read_mode)
+    h = hash_func()
+    try:
+        with open(file_path, "rb") as f:
+            for offset, length in ranges:
+                f.seek(offset)
+                h.update(f.read(length))
+    except Exception as e:
+        logging.warning(f"Cannot read file {file_path}: {e}")
+        return None
+    return h.hexdigest()
+
+def partial_hash_kind(settings):
+    # Hash cache kind (and manifest tag) of sample digests - other block sizes give other digests
+    return "partial:{head_size}:{tail_size}:{sample_count}:{sample_size}".format(**settings)
+
+# --- Parallel hashing engine ---
+def hash_in_parallel(jobs, hash_item, workers, device_workers=None, depth_callback=None, scheduler=None):
+    # jobs yields ((path, st), digest_or_None); missing digests are computed by a per-device
+    # scheduler, so every disk is read at its own concurrency. Yields (item, digest, computed)
+    # in job order so results never depend on scheduling. depth_callback(n) gets the number of
+    # jobs waiting to be yielded each time one is added. Pipelined stages pass one shared
+    # scheduler (owned and shut down by the caller), or each stage would get its own readers.
+    if workers <= 1:
+        for item, digest in jobs:
+            if digest is not None:
+                yield item, digest, False
+            else:
+                yield item, hash_item(item), True
+        return
+
+    owned = scheduler is None
+    if owned:
+        scheduler = DeviceScheduler(workers, device_workers)
+    pending = deque()
+    queued = Counter()  # jobs per device submitted but not yet yielded
+
+    def next_result():
+        item, digest, future = pending.popleft()
+        if future is None:
+            return item, digest, False
+        queued[item[1].st_dev] -= 1
+        return item, future.result(), True
+
+    try:
+        for item, digest in jobs:
+            if cancel_event.is_set():
+                return
+            if digest is None:
+                st_dev = item[1].st_dev
+                depth = max(scheduler.limit(st_dev) * HASH_QUEUE_FACTOR, DEVICE_LOOKAHEAD)
+                # Only a device with a full queue holds back the scan; other disks keep reading
+                while queued[st_dev] >= depth:
+                    yield next_result()
+                queued[st_dev] += 1
+                pending.append((item, None, scheduler.submit(hash_item, item)))
+            else:
+                pending.append((item, digest, None))
+            if depth_callback:
+                depth_callback(len(pending))
+            # Hand back everything already finished at the front, and block once too much waits
+            while pending and (pending[0][2] is None or pending[0][2].done()
+                               or len(pending) >= HASH_PENDING_LIMIT):
+                yield next_result()
+        while pending:
+            yield next_result()
+    finally:
+        if owned:
+            scheduler.shutdown()
+        else:
+            # Stopped early: work nobody will collect must not hold up the shared devices
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
@@ -0,0 +1,269 @@
+import os
+import sys
+import struct
+import sqlite3
+import logging
+from array import array
+
+# Estimated memory the in-memory indexes of one pool (a scan's stage tables and duplicate index)
+# may use together before the largest moves to a SQLite file
+INDEX_MEMORY_BUDGET = 1024 * 1024 * 1024
+INDEX_CHECK_EVERY = 65536   # entries between memory estimates
+INDEX_SPILL_BATCH = 10000   # entries written to SQLite at once after spilling
+FINGERPRINT_BYTES = 8
+STAT_RECORD = struct.Struct("=QQQqI")  # st_dev, st_ino, st_size, st_mtime_ns, st_nlink
+
+# take_first() results for a file that is now held as the first of its key, and for a later
+# file whose key's first file was already handed back
+HELD = "held"
+RELEASED = "released"
+
+# --- Slim stat record ---
+class FileStat:
+    # The stat fields the engine uses, without the rest of os.stat_result
+    __slots__ = ("st_dev", "st_ino", "st_size", "st_mtime_ns", "st_nlink")
+
+    def __init__(self, st_dev, st_ino, st_size, st_mtime_ns, st_nlink):
+        self.st_dev = st_dev
+        self.st_ino = st_ino
+        self.st_size = st_size
+        self.st_mtime_ns = st_mtime_ns
+        self.st_nlink = st_nlink
+
+    @classmethod
+    def from_stat(cls, st):
+        return cls(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_nlink)
+
+def encode_key(key):
+    # Hex digests are stored as raw bytes; compare-mode group keys (size, sample digest) get a
+    # zero byte prefix and a fixed-width size so they never equal a digest of the same algorithm,
+    # and bare sizes (stage 1) a one byte prefix
+    if isinstance(key, str):
+        return bytes.fromhex(key)
+    if isinstance(key, int):
+        return b"\1" + key.to_bytes(8, "little")
+    size, sample_digest = key
+    return b"\0" + size.to_bytes(8, "little") + bytes.fromhex(sample_digest)
+
+# --- Shared folders and memory budget ---
+class IndexPool:
+    # Interned folders and one memory budget for several indexes (the engine's stage tables and
+    # its duplicate index). Past the budget the largest index still in memory moves to disk.
+    def __init__(self, memory_budget=INDEX_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self.folders = {}
+        self.folder_names = []
+        self.last_folder, self.last_folder_id = None, None
+        self.indexes = []
+
+    def folder_id(self, folder):
+        # Files arrive folder by folder, so the last folder is checked before the dict
+        if folder == self.last_folder:
+            return self.last_folder_id
+        folder_id = self.folders.get(folder)
+        if folder_id is None:
+            folder_id = self.folders[folder] = len(self.folder_names)
+            self.folder_names.append(folder)
+        self.last_folder, self.last_folder_id = folder, folder_id
+        return folder_id
+
+    def memory_usage(self):
+        return sum(index.memory_usage() for index in self.indexes)
+
+    def check(self):
+        while self.memory_usage() > self.memory_budget:
+            in_memory = [index for index in self.indexes if index.conn is None and index.spill_path and index.count]
+            if not in_memory:
+                return
+            max(in_memory, key=lambda index: index.memory_usage())._spill()
+
+# --- Duplicate index ---
+class DuplicateIndex:
+    # Content key -> first file seen with it, stored as parallel arrays instead of per-file
+    # Python objects: a dict from the key's last 8 bytes as a fingerprint to a record number (full
+    # keys are checked, fingerprint clashes go to a small overflow dict), paths split into an
+    # interned folder id plus a file name, and the stat fields packed into one buffer. Each entry can
+    # carry an extra digest. Past the pool's memory budget everything moves to a SQLite file at
+    # spill_path. Without a pool the index has a budget of its own.
+    def __init__(self, spill_path=None, memory_budget=INDEX_MEMORY_BUDGET, pool=None):
+        self.spill_path = spill_path
+        self.pool = pool or IndexPool(memory_budget)
+        self.pool.indexes.append(self)
+        self.count = 0
+        self.conn = None
+        self.pending = {}
+        self._reset_memory()
+
+    def _reset_memory(self):
+        self.fingerprints = {}
+        self.overflow = {}
+        self.keys = bytearray()
+        self.key_offsets = array("Q", [0])
+        self.names = bytearray()
+        self.name_offsets = array("Q", [0])
+        self.folder_ids = array("I")
+        self.stats = bytearray()
+        self.extras = bytearray()
+        self.extra_offsets = array("Q", [0])
+        self.released = bytearray()
+
+    def __len__(self):
+        return self.count
+
+    def _record_key(self, record):
+        return bytes(self.keys[self.key_offsets[record]:self.key_offsets[record + 1]])
+
+    def _find(self, raw):
+        record = self.fingerprints.get(int.from_bytes(raw[-FINGERPRINT_BYTES:], "little"))
+        if record is not None and self._record_key(record) == raw:
+            return record
+        return self.overflow.get(raw)
+
+    def _entry(self, record):
+        name = bytes(self.names[self.name_offsets[record]:self.name_offsets[record + 1]])
+        path = os.path.join(self.pool.folder_names[self.folder_ids[record]], os.fsdecode(name))
+        st = FileStat(*STAT_RECORD.unpack_from(self.stats, record * STAT_RECORD.size))
+        return path, st
+
+    def get(self, key):
+        # (path, stat) of the first file stored under key, or None
+        raw = encode_key(key)
+        if self.conn is not None:
+            return self._get_spilled(raw)
+        record = self._find(raw)
+        return None if record is None else self._entry(record)
+
+    def put(self, key, path, st, extra=None):
+        self._add(encode_key(key), path, st, extra)
+
+    def take_first(self, key, path, st, extra=None):
+        # Holds path as the first file of key and returns HELD. For a later file of key, returns
+        # the held (path, stat, extra) the first time, and RELEASED after that.
+        raw = encode_key(key)
+        if self.conn is not None:
+            return self._take_first_spilled(raw, path, st, extra)
+        record = self._find(raw)
+        if record is None:
+            self._add(raw, path, st, extra)
+            return HELD
+        if self.released[record]:
+            return RELEASED
+        self.released[record] = 1
+        extra = bytes(self.extras[self.extra_offsets[record]:self.extra_offsets[record + 1]])
+        return self._entry(record) + (extra.hex() if extra else None,)
+
+    def held_sizes(self):
+        # Sizes of the entries never handed back by take_first()
+        if self.conn is not None:
+            self._flush_pending()
+            return [row[0] for row in self.conn.execute("SELECT size FROM entries WHERE released=0")]
+        return [size for (_, _, size, _, _), released in zip(STAT_RECORD.iter_unpack(self.stats), self.released)
+                if not released]
+
+    def _add(self, raw, path, st, extra):
+        folder, name = os.path.split(path)
+        extra = bytes.fromhex(extra) if extra else b""
+        if self.conn is not None:
+            self.pending[raw] = (self.pool.folder_id(folder), os.fsencode(name), st.st_dev, st.st_ino,
+                                 st.st_size, st.st_mtime_ns, st.st_nlink, extra, 0)
+            if len(self.pending) >= INDEX_SPILL_BATCH:
+                self._flush_pending()
+            self.count += 1
+            return
+
+        record = len(self.released)
+        fingerprint = int.from_bytes(raw[-FINGERPRINT_BYTES:], "little")
+        if fingerprint in self.fingerprints:
+            self.overflow[raw] = record
+        else:
+            self.fingerprints[fingerprint] = record
+        self.keys += raw
+        self.key_offsets.append(len(self.keys))
+        self.names += os.fsencode(name)
+        self.name_offsets.append(len(self.names))
+        self.folder_ids.append(self.pool.folder_id(folder))
+        self.stats += STAT_RECORD.pack(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_nlink)
+        self.extras += extra
+        self.extra_offsets.append(len(self.extras))
+        self.released.append(0)
+        self.count += 1
+        if self.count % INDEX_CHECK_EVERY == 0:
+            self.pool.check()
+
+    def memory_usage(self):
+        # Estimate in bytes: buffers plus the fingerprint dict with its int keys and values
+        buffers = (self.keys, self.key_offsets, self.names, self.name_offsets, self.folder_ids,
+                   self.stats, self.extras,
+                   self.extra_offsets, self.released)
+        ints = len(self.fingerprints) * (sys.getsizeof(2 ** 62) + sys.getsizeof(2 ** 20))
+        return sum(sys.getsizeof(buf) for buf in buffers) + sys.getsizeof(self.fingerprints) + ints
+
+    # --- Spilling to SQLite ---
+    def _spill(self):
+        logging.info(f"Memory budget of {self.pool.memory_budget // (1024 * 1024)} MB passed, moving "
+                     f"{self.count:,} entries to {self.spill_path}.")
+        if os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+        self.conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(
+            "CREATE TABLE entries (key BLOB PRIMARY KEY, folder INTEGER, name BLOB, dev INTEGER, "
+            "ino INTEGER, size INTEGER, mtime_ns INTEGER, nlink INTEGER, extra BLOB, "
+            "released INTEGER) WITHOUT ROWID")
+        rows = ((self._record_key(record), self.folder_ids[record],
+                 bytes(self.names[self.name_offsets[record]:self.name_offsets[record + 1]]),
+                 *STAT_RECORD.unpack_from(self.stats, record * STAT_RECORD.size),
+                 bytes(self.extras[self.extra_offsets[record]:self.extra_offsets[record + 1]]),
+                 self.released[record]) for record in range(len(self.released)))
+        self.conn.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+        self._reset_memory()
+
+    def _flush_pending(self):
+        self.conn.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              ((raw,) + values for raw, values in self.pending.items()))
+        self.conn.commit()
+        self.pending = {}
+
+    def _row(self, raw):
+        row = self.pending.get(raw)
+        if row is None:
+            row = self.conn.execute(
+                "SELECT folder, name, dev, ino, size, mtime_ns, nlink, extra, released FROM entries "
+                "WHERE key=?", (raw,)).fetchone()
+        return row
+
+    def _row_entry(self, row):
+        folder_id, name, dev, ino, size, mtime_ns, nlink = row[:7]
+        path = os.path.join(self.pool.folder_names[folder_id], os.fsdecode(name))
+        return path, FileStat(dev, ino, size, mtime_ns, nlink)
+
+    def _get_spilled(self, raw):
+        row = self._row(raw)
+        return None if row is None else self._row_entry(row)
+
+    def _take_first_spilled(self, raw, path, st, extra):
+        row = self._row(raw)
+        if row is None:
+            self._add(raw, path, st, extra)
+            return HELD
+        if row[8]:
+            return RELEASED
+        if raw in self.pending:
+            self.pending[raw] = row[:8] + (1,)
+        else:
+            self.conn.execute("UPDATE entries SET released=1 WHERE key=?", (raw,))
+        return self._row_entry(row) + (row[7].hex() if row[7] else None,)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+        self._reset_memory()
+        if self in self.pool.indexes:
+            self.pool.indexes.remove(self)
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s]: %(message)s"
+
+# Action journal - one JSON object per line, written every JOURNAL_BATCH_SIZE records
+JOURNAL_BATCH_SIZE = 256
+
+# --- Logging off the hot path ---
+class _RunHandlers(logging.Handler):
+    # The listener's only handler; forwards to whatever the current run installed
+    def __init__(self):
+        super().__init__()
+        self.handlers = []
+
+    def emit(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+_log_queue = queue.Queue()
+_run_handlers = _RunHandlers()
+_listener = None
+_setup_lock = threading.Lock()
+
+def _start_listener():
+    # Once per process: the root logger only enqueues, a listener thread formats and writes
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        root_logger = logging.getLogger()
+        root_logger.setLevel(logging.INFO)
+        root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+        _listener = logging.handlers.QueueListener(_log_queue, _run_handlers)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+def setup_logging(log_dir, handler=None):
+    # Points the process-wide listener at a new log file (and UI/console handler) for this run
+    _start_listener()
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = os.path.join(log_dir, f"duplicate_deletion_{timestamp}.log")
+
+    file_handler = logging.FileHandler(log_file, encoding="utf-8", errors="backslashreplace")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [file_handler]
+    if handler:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(handler)
+
+    flush_logging()
+    previous, _run_handlers.handlers = _run_handlers.handlers, handlers
+    for old in previous:
+        old.close()
+    return log_file
+
+def flush_logging():
+    # Blocks until the listener has written every record queued so far
+    if _listener is not None:
+        _log_queue.join()
+    for handler in _run_handlers.handlers:
+        handler.flush()
+
+# --- Operations journal ---
+class ActionJournal:
+    # Machine-readable record of every duplicate handled: path, size, digest, kept file,
+    # destination, outcome and how long the action took. Buffered and written in batches.
+    # Non-ASCII is escaped, so names that are not valid UTF-8 round-trip through json.loads.
+    def __init__(self, journal_path):
+        self.path = journal_path
+        self.file = open(journal_path, "a", encoding="utf-8")
+        self.buffer = []
+
+    def record(self, action, path, size, digest, kept_path, destination=None, seconds=0.0,
+               status="ok", error=None):
+        entry = {
+            "time": time.time(),
+            "action": action,
+            "path": path,
+            "size": size,
+            "digest": digest,
+            "kept": kept_path,
+            "destination": destination,
+            "seconds": round(seconds, 6),
+            "status": status
+        }
+        if error:
+            entry["error"] = error
+        self.buffer.append(json.dumps(entry))
+        if len(self.buffer) >= JOURNAL_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def open_journal(log_dir, log_file):
+    # The journal sits next to the run's log file and shares its timestamp
+    name = os.path.basename(log_file).replace("duplicate_deletion_", "actions_")
+    return ActionJournal(os.path.join(log_dir, os.path.splitext(name)[0] + ".jsonl"))
@@ -0,0 +1,255 @@
+import os
+import gzip
+import json
+import time
+import heapq
+import socket
+import logging
+import itertools
+
+from .hashing import (
+    PARTIAL_HASH_SETTINGS, DEFAULT_HASH_WORKERS, DEFAULT_READ_MODE, cancel_event, hash_algorithm_name,
+    get_file_hash, get_sample_ranges, get_partial_hash, partial_hash_kind, hash_in_parallel
+)
+from .cache import HASH_CACHE_FILE, HashCache
+from .devices import DeviceScheduler
+from .scanner import ScanRules, normalize_roots, scan_roots
+from .logs import setup_logging, flush_logging
+
+# Scan manifests are gzip-compressed JSON lines: a header, then one record per file
+#   [size, sample digest, full digest or null, path, st_dev, st_ino, st_mtime_ns]
+# sorted by (size, sample digest) and otherwise in discovery order. Manifests of different
+# hosts, or of subtrees scanned in parallel, are joined by merge_manifests() one
+# (size, sample digest) run at a time, so a merge never holds more than one group in memory.
+MANIFEST_VERSION = 1
+MANIFEST_LEVELS = ("sample", "full")
+MANIFEST_SORT_CHUNK = 500000  # records sorted in memory before a run is spilled to the log folder
+
+def record_key(record):
+    return record[0], record[1]
+
+def write_lines(path, header, items):
+    # Written under a temporary name and renamed, like plan files. JSON is ASCII-escaped, so
+    # paths that are not valid UTF-8 round-trip.
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for item in items:
+            f.write(json.dumps(item, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, path)
+
+def _read_lines(f):
+    with f:
+        for line in f:
+            yield json.loads(line)
+
+# --- Export ---
+def export_manifest(directory, manifest_path, log_dir, hash_func, level="sample", host=None,
+                    include_empty=False, use_cache=True, workers=DEFAULT_HASH_WORKERS, device_workers=None,
+                    read_mode=DEFAULT_READ_MODE, scan_rules=None, partial_settings=None, log_handler=None):
+    # Writes a manifest of every file in one folder or a list of folders, touching nothing.
+    # Every record has a sample digest; the full digest is filled in for files small enough to
+    # be read whole, hash cache hits and, with level "full", every file. Returns (files, skipped).
+    if level not in MANIFEST_LEVELS:
+        raise ValueError(f"Unknown manifest level: {level}")
+    setup_logging(log_dir, log_handler)
+    roots = normalize_roots(directory)
+    rules = (scan_rules or ScanRules()).excluding(log_dir)
+    cache = HashCache(os.path.join(log_dir, HASH_CACHE_FILE)) if use_cache else None
+    try:
+        return _export(roots, manifest_path, log_dir, hash_func, level, host or socket.gethostname(),
+                       include_empty, cache, workers, device_workers, read_mode, rules,
+                       dict(PARTIAL_HASH_SETTINGS, **(partial_settings or {})))
+    finally:
+        if cache:
+            cache.close()
+        flush_logging()
+
+def _export(roots, manifest_path, log_dir, hash_func, level, host, include_empty, cache, workers,
+            device_workers, read_mode, rules, settings):
+    algorithm = hash_algorithm_name(hash_func)
+    partial_kind = partial_hash_kind(settings)
+    skipped = 0
+    # Shared by the sample and full stages, so each disk keeps its read limit
+    scheduler = DeviceScheduler(workers, device_workers) if workers > 1 else None
+
+    def sample_kind(size):
+        # Same cache entries as a scan: files covered by the samples are hashed whole
+        return "full" if get_sample_ranges(size, **settings) is None else partial_kind
+
+    def sample_jobs():
+        nonlocal skipped
+        for path, st in scan_roots(roots, rules):
+            if cancel_event.is_set():
+                return
+            if st is None:
+                skipped += 1
+            elif st.st_size or include_empty:
+                yield (path, st), cache.get(st, algorithm, sample_kind(st.st_size)) if cache else None
+
+    def hash_sample(item):
+        path, st = item
+        return get_partial_hash(path, hash_func, st.st_size, read_mode=read_mode, **settings)
+
+    def sampled():
+        nonlocal skipped
+        for (path, st), sample, computed in hash_in_parallel(sample_jobs(), hash_sample, workers,
+                                                             device_workers, scheduler=scheduler):
+            if not sample:
+                skipped += 1
+                continue
+            if computed and cache:
+                cache.put(path, st, algorithm, sample_kind(st.st_size), sample)
+            if get_sample_ranges(st.st_size, **settings) is None:
+                full = sample
+            else:
+                full = cache.get(st, algorithm, "full") if cache else None
+            yield path, st, sample, full
+
+    def records():
+        nonlocal skipped
+        if level == "sample":
+            for path, st, sample, full in sampled():
+                yield [st.st_size, sample, full, path, st.st_dev, st.st_ino, st.st_mtime_ns]
+            return
+        jobs = (((path, st, sample), full) for path, st, sample, full in sampled())
+        results = hash_in_parallel(jobs, lambda item: get_file_hash(item[0], hash_func, read_mode), workers,
+                                   device_workers, scheduler=scheduler)
+        for (path, st, sample), full, computed in results:
+            if not full:
+                skipped += 1
+                continue
+            if computed and cache:
+                cache.put(path, st, algorithm, "full", full)
+            yield [st.st_size, sample, full, path, st.st_dev, st.st_ino, st.st_mtime_ns]
+
+    # Sorted runs of MANIFEST_SORT_CHUNK records go to the log folder and are merged at the end.
+    # Python's sort and heapq.merge are stable, so equal keys stay in discovery order.
+    files, runs, chunk, partial_only = 0, [], [], 0
+    try:
+        for record in records():
+            files += 1
+            partial_only += record[2] is None
+            chunk.append(record)
+            if len(chunk) >= MANIFEST_SORT_CHUNK:
+                chunk.sort(key=record_key)
+                run_path = os.path.join(log_dir, f"manifest_run_{os.getpid()}_{len(runs)}.jsonl.gz")
+                write_lines(run_path, {"run": len(runs)}, chunk)
+                runs.append(run_path)
+                chunk = []
+        chunk.sort(key=record_key)
+        complete = not cancel_event.is_set()
+        if not complete:
+            logging.warning("Export cancelled by user; the manifest is incomplete.")
+        header = {
+            "version": MANIFEST_VERSION,
+            "host": host,
+            "roots": roots,
+            "algorithm": algorithm,
+            "sample": partial_kind,
+            "level": level,
+            "created": time.time(),
+            "files": files,
+            "complete": complete
+        }
+        streams = []
+        for run_path in runs:
+            f = gzip.open(run_path, "rt", encoding="utf-8", errors="surrogateescape")
+            f.readline()
+            streams.append(_read_lines(f))
+        write_lines(manifest_path, header, heapq.merge(*streams, chunk, key=record_key))
+    finally:
+        if scheduler:
+            scheduler.shutdown()
+        for run_path in runs:
+            os.remove(run_path)
+    logging.info(f"Manifest {manifest_path}: {files} files ({partial_only} with a sample digest only), "
+                 f"{skipped} skipped.")
+    return files, skipped
+
+# --- Merge ---
+def read_manifest_header(manifest_path):
+    with gzip.open(manifest_path, "rt", encoding="utf-8", errors="surrogateescape") as f:
+        header = json.loads(f.readline())
+    if header.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {manifest_path}: {header.get('version')}")
+    return header
+
+def read_scan_manifest(manifest_path):
+    # Returns (header, records iterator); records out of order raise ValueError
+    header = read_manifest_header(manifest_path)
+    f = gzip.open(manifest_path, "rt", encoding="utf-8", errors="surrogateescape")
+    f.readline()
+
+    def records():
+        previous = None
+        for record in _read_lines(f):
+            key = record_key(record)
+            if previous is not None and key < previous:
+                raise ValueError(f"Manifest {manifest_path} is not sorted")
+            previous = key
+            yield record
+
+    return header, records()
+
+def merge_manifests(manifest_paths, cross_host=False):
+    # Joins manifests in one streaming sort-merge. Returns (headers, groups iterator). Files of
+    # earlier manifests come first in each group, so they are the ones to keep. A group is
+    # confirmed when all its files have the same full digest; when some files only have a
+    # sample digest, all files sharing size and sample digest form one unconfirmed group.
+    headers = [read_manifest_header(path) for path in manifest_paths]
+    for path, header in zip(manifest_paths, headers):
+        if (header["algorithm"], header["sample"]) != (headers[0]["algorithm"], headers[0]["sample"]):
+            raise ValueError(f"{path} was written with {header['algorithm']} and {header['sample']}, "
+                             f"{manifest_paths[0]} with {headers[0]['algorithm']} and {headers[0]['sample']}")
+
+    def tagged(path, host):
+        _, records = read_scan_manifest(path)
+        for record in records:
+            yield host, record
+
+    def groups():
+        streams = [tagged(path, header["host"]) for path, header in zip(manifest_paths, headers)]
+        merged = heapq.merge(*streams, key=lambda item: record_key(item[1]))
+        for (size, sample), bucket in itertools.groupby(merged, key=lambda item: record_key(item[1])):
+            bucket = list(bucket)
+            if len(bucket) < 2:
+                continue
+            for group in _bucket_groups(size, sample, bucket):
+                if not cross_host or len(group["hosts"]) > 1:
+                    yield group
+
+    return headers, groups()
+
+def _bucket_groups(size, sample, bucket):
+    # Hardlinks, and files listed by overlapping manifests of one host, count once
+    seen, members = set(), []
+    for host, record in bucket:
+        inode = (host, record[4], record[5])
+        if record[5] and inode in seen:
+            continue
+        seen.add(inode)
+        members.append((host, record))
+    if len(members) < 2:
+        return
+    if any(record[2] is None for _, record in members):
+        group = _group(size, sample, None, members)
+        group["digests"] = [record[2] for _, record in members]
+        yield group
+        return
+    by_digest = {}
+    for host, record in members:
+        by_digest.setdefault(record[2], []).append((host, record))
+    for digest, same in by_digest.items():
+        if len(same) > 1:
+            yield _group(size, sample, digest, same)
+
+def _group(size, sample, digest, members):
+    return {
+        "size": size,
+        "sample": sample,
+        "digest": digest,
+        "confirmed": digest is not None,
+        "hosts": list(dict.fromkeys(host for host, _ in members)),
+        "members": [[host, record[3], record[4], record[5], size, record[6]] for host, record in members]
+    }
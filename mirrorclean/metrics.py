@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+
+# Where a run's time goes. The engine thread is always charged to exactly one stage:
+#   walk   - os.scandir and stat, scan rules and stage 1 grouping by size
+#   cache  - hash cache lookups
+#   sample - waiting for stage 2 sample digests
+#   hash   - waiting for stage 3 full hashes and byte comparisons
+#   index  - duplicate index lookups and bookkeeping
+#   act    - copying, moving and linking duplicates
+#   report - progress/status/duplicate callbacks and checkpoints
+# sample_work and hash_work add up the time worker threads spent reading and hashing, and
+# ui the time the GUI spent redrawing, so they overlap the stages above.
+METRICS_STAGES = ("walk", "cache", "sample", "hash", "index", "act", "report")
+METRICS_WORK = ("sample_work", "hash_work", "ui")
+METRICS_COUNTERS = (
+    "files_found", "empty_files", "unique_size", "sample_reads", "sample_bytes", "sample_cache_hits",
+    "sample_pruned", "full_reads", "full_bytes", "full_cache_hits", "compared", "distinct",
+    "duplicates", "skipped", "folders_pruned", "files_excluded", "bytes_not_read"
+)
+METRICS_PEAKS = ("sample_queue", "hash_queue")
+
+# --- Run metrics ---
+class RunMetrics:
+    # Counters and timers for one run. All keys exist from the start, so the UI thread can
+    # copy them while the engine updates them without locking.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = dict.fromkeys(METRICS_COUNTERS, 0)
+        self.seconds = dict.fromkeys(METRICS_STAGES + METRICS_WORK, 0.0)
+        self.peaks = dict.fromkeys(METRICS_PEAKS, 0)
+        self.stage = "index"
+        self.since = time.perf_counter()
+        self.started = time.time()
+        self.finished = None
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def peak(self, name, value):
+        if value > self.peaks[name]:
+            self.peaks[name] = value
+
+    def switch(self, stage):
+        # Charges the time since the last switch to the current stage; returns that stage
+        now = time.perf_counter()
+        self.seconds[self.stage] += now - self.since
+        self.since = now
+        previous, self.stage = self.stage, stage
+        return previous
+
+    def timed(self, iterable, stage):
+        # Charges the time spent producing each item to stage. This is switch() inlined, as it
+        # runs several times per file; nested timed() calls restore stage before returning.
+        next_item = iter(iterable).__next__
+        seconds, clock = self.seconds, time.perf_counter
+        while True:
+            now = clock()
+            previous = self.stage
+            seconds[previous] += now - self.since
+            self.since, self.stage = now, stage
+            try:
+                item = next_item()
+            except StopIteration:
+                self.switch(previous)
+                return
+            now = clock()
+            seconds[stage] += now - self.since
+            self.since, self.stage = now, previous
+            yield item
+
+    def add_time(self, name, seconds):
+        # For other threads
+        with self.lock:
+            self.seconds[name] += seconds
+
+    def timed_call(self, name, func):
+        # func wrapped to add its running time to name, for worker threads
+        lock, seconds, clock = self.lock, self.seconds, time.perf_counter
+
+        def call(*args):
+            started = clock()
+            try:
+                return func(*args)
+            finally:
+                elapsed = clock() - started
+                with lock:
+                    seconds[name] += elapsed
+        return call
+
+    def finish(self):
+        self.switch(self.stage)
+        self.finished = time.time()
+
+    def snapshot(self):
+        elapsed = (self.finished or time.time()) - self.started
+        return {
+            "elapsed": round(elapsed, 3),
+            "seconds": {name: round(value, 3) for name, value in dict(self.seconds).items()},
+            "counters": dict(self.counters),
+            "peaks": dict(self.peaks)
+        }
+
+    def summary(self):
+        # Two short lines for logs and the GUI stats panel
+        seconds, counters = dict(self.seconds), dict(self.counters)
+        stages = ", ".join(f"{name} {seconds[name]:.1f}s" for name in METRICS_STAGES if seconds[name] >= 0.05)
+        read_mb = (counters["sample_bytes"] + counters["full_bytes"]) / (1024 * 1024)
+        return (f"Time: {stages or '-'} | workers: sample {seconds['sample_work']:.1f}s, "
+                f"hash {seconds['hash_work']:.1f}s | UI {seconds['ui']:.1f}s\n"
+                f"Read: {counters['sample_reads']:,} samples, {counters['full_reads']:,} full files "
+                f"({read_mb:,.1f} MB), {counters['compared']:,} compared | cache hits: "
+                f"{counters['sample_cache_hits'] + counters['full_cache_hits']:,} | queues: "
+                f"{self.peaks['sample_queue']}/{self.peaks['hash_queue']}")
+
+def write_metrics(log_dir, log_file, metrics, completed, options=None):
+    # The metrics file sits next to the run's log file and shares its timestamp
+    name = os.path.basename(log_file).replace("duplicate_deletion_", "metrics_")
+    path = os.path.join(log_dir, os.path.splitext(name)[0] + ".json")
+    data = dict(metrics.snapshot(), completed=completed, options=options or {})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    return path
@@ -0,0 +1,156 @@
+import os
+import gzip
+import json
+import time
+import logging
+
+from .hashing import cancel_event, hash_algorithm_name, get_hash_algorithm, find_hash_algorithm
+from .actions import ACTION_MODES, DEFAULT_ACTION
+from .engine import BACKUP_DIR_NAME, common_root, act_on_duplicate, remove_duplicate_files
+from .scanner import normalize_roots
+from .store import BackupStore
+from .logs import setup_logging, flush_logging, open_journal
+
+# Plan files are gzip-compressed JSON lines: a header, then one line per duplicate group
+# whose first member is the file to keep. Each member carries the stat signature it had
+# when it was hashed, so applying a plan only needs a stat() per file.
+PLAN_VERSION = 1
+
+def stat_signature(st):
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+
+def signature_matches(path, signature):
+    try:
+        return stat_signature(os.stat(path)) == signature
+    except OSError:
+        return False
+
+# --- Writing plans ---
+def write_plan(plan_path, header, groups):
+    # Written under a temporary name and renamed, so a plan file is never half-written
+    # and ASCII-escaped, so paths that are not valid UTF-8 round-trip
+    tmp_path = plan_path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for group in groups:
+            f.write(json.dumps(group, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, plan_path)
+
+def create_plan(directory, plan_path, log_dir, hash_func, **options):
+    # Scans one folder or a list of folders without touching anything and saves the duplicate
+    # groups. Returns (duplicates, skipped, groups). options go to remove_duplicate_files.
+    roots = normalize_roots(directory)
+    groups = {}
+
+    def on_duplicate(path, st, kept_path, kept_st, digest):
+        group = groups.get(kept_path)
+        if group is None:
+            group = groups[kept_path] = {
+                "digest": digest,
+                "size": st.st_size,
+                "members": [[kept_path] + stat_signature(kept_st)]
+            }
+        group["members"].append([path] + stat_signature(st))
+
+    duplicates, skipped = remove_duplicate_files(
+        roots, os.path.join(roots[0], BACKUP_DIR_NAME), log_dir, hash_func, False,
+        dry_run=True, duplicate_callback=on_duplicate, **options)
+    header = {
+        "version": PLAN_VERSION,
+        "directory": common_root(roots),
+        "roots": roots,
+        "algorithm": hash_algorithm_name(hash_func),
+        "created": time.time(),
+        "groups": len(groups),
+        "files": sum(len(group["members"]) for group in groups.values()),
+        "complete": not cancel_event.is_set()
+    }
+    write_plan(plan_path, header, groups.values())
+    return duplicates, skipped, len(groups)
+
+# --- Reading and applying plans ---
+def read_plan_header(plan_path):
+    with gzip.open(plan_path, "rt", encoding="utf-8", errors="surrogateescape") as f:
+        return json.loads(f.readline())
+
+def plan_directory(header):
+    # The roots' common folder, or the first root when they share none
+    return header["directory"] or header["roots"][0]
+
+def read_plan(plan_path):
+    # Returns (header, groups iterator)
+    f = gzip.open(plan_path, "rt", encoding="utf-8", errors="surrogateescape")
+    header = json.loads(f.readline())
+    if header.get("version") != PLAN_VERSION:
+        f.close()
+        raise ValueError(f"Unsupported plan version: {header.get('version')}")
+
+    def groups():
+        with f:
+            for line in f:
+                yield json.loads(line)
+
+    return header, groups()
+
+def apply_plan(plan_path, log_dir, backup_dir=None, action=DEFAULT_ACTION, preserve_structure=False,
+               progress_callback=None, log_handler=None, store_compression="none"):
+    # Acts on every planned duplicate whose stat signature is unchanged; nothing is rehashed.
+    # If the kept file changed, the first unchanged member of its group is kept instead.
+    # Returns (duplicates, skipped, changed).
+    if action not in ACTION_MODES:
+        raise ValueError(f"Unknown action: {action}")
+    log_file = setup_logging(log_dir, log_handler)
+    header, groups = read_plan(plan_path)
+    directory = plan_directory(header)
+    if header["directory"] is None and preserve_structure:
+        logging.warning("Folders are on different drives; backups are stored without folder structure.")
+        preserve_structure = False
+    backup_dir = backup_dir or os.path.join(directory, BACKUP_DIR_NAME)
+    if action in ("copy", "move") and not os.path.exists(backup_dir):
+        os.makedirs(backup_dir)
+    if not header.get("complete", True):
+        logging.warning(f"Plan {plan_path} comes from a cancelled scan and may be incomplete.")
+
+    store = None
+    if action == "store":
+        # Blobs are named with the plan's algorithm, so the plan's digests can be reused
+        label = find_hash_algorithm(header["algorithm"])
+        if label is None:
+            raise ValueError(f"The plan's hash algorithm is not available: {header['algorithm']}")
+        store = BackupStore(backup_dir, store_compression, get_hash_algorithm(label))
+    duplicate_count, skipped_count, changed_count, processed = 0, 0, 0, 0
+    journal = open_journal(log_dir, log_file)
+    try:
+        for group in groups:
+            if cancel_event.is_set():
+                logging.warning("Process cancelled by user.")
+                break
+            kept_path = None
+            for path, *signature in group["members"]:
+                processed += 1
+                if not signature_matches(path, signature):
+                    logging.warning(f"Changed since the plan was made: {path}. Skipped.")
+                    changed_count += 1
+                    continue
+                if kept_path is None:
+                    kept_path = path
+                    continue
+                outcome = act_on_duplicate(action, path, group["size"], group["digest"], kept_path,
+                                           directory, backup_dir, preserve_structure, journal, store)
+                if outcome == "ok":
+                    duplicate_count += 1
+                elif outcome == "skipped":
+                    skipped_count += 1
+            if progress_callback:
+                try:
+                    progress_callback(processed, header["files"])
+                except Exception:
+                    pass
+        logging.info(f"Plan applied: {duplicate_count} duplicates handled, {skipped_count} skipped, "
+                     f"{changed_count} changed since the plan was made.")
+    finally:
+        if store:
+            store.close()
+        journal.close()
+        flush_logging()
+    return duplicate_count, skipped_count + changed_count, changed_count
@@ -0,0 +1,180 @@
+import os
+import re
+import stat
+import fnmatch
+import logging
+
+# --- Walk-time rules ---
+class ScanRules:
+    # Filters applied during the walk, so an excluded folder is never entered.
+    # exclude/include: glob patterns, matched against the name, or against the path below
+    #   the root when they contain "/"; "re:" starts a regular expression searched in that path.
+    #   include only limits files - folders are always entered unless excluded.
+    # extensions/exclude_extensions: allow and deny lists such as ".jpg"
+    # min_size/max_size: file size limits in bytes
+    # one_filesystem: do not cross into other mounted filesystems
+    # skip_symlinks: ignore symlinked files (symlinked folders are never followed)
+    # exclude_paths: folders skipped wherever they are, e.g. the tool's own backup and logs
+    def __init__(self, exclude=(), include=(), extensions=(), exclude_extensions=(), min_size=0,
+                 max_size=None, one_filesystem=False, skip_symlinks=False, exclude_paths=()):
+        self.exclude = list(exclude)
+        self.include = list(include)
+        self.extensions = [normalize_extension(ext) for ext in extensions]
+        self.exclude_extensions = [normalize_extension(ext) for ext in exclude_extensions]
+        self.min_size = min_size
+        self.max_size = max_size
+        self.one_filesystem = one_filesystem
+        self.skip_symlinks = skip_symlinks
+        self.exclude_paths = [os.path.normcase(os.path.abspath(path)) for path in exclude_paths]
+        self._exclude = compile_patterns(self.exclude)
+        self._include = compile_patterns(self.include)
+        self.pruned_dirs, self.skipped_files = 0, 0
+
+    def as_dict(self):
+        return {
+            "exclude": self.exclude,
+            "include": self.include,
+            "extensions": self.extensions,
+            "exclude_extensions": self.exclude_extensions,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "one_filesystem": self.one_filesystem,
+            "skip_symlinks": self.skip_symlinks,
+            "exclude_paths": self.exclude_paths
+        }
+
+    def excluding(self, *paths):
+        # A copy that also skips paths (None entries are ignored)
+        paths = [path for path in paths if path]
+        return ScanRules(**dict(self.as_dict(), exclude_paths=self.exclude_paths + paths))
+
+    def skip_dir(self, entry, rel_path, root_dev):
+        skip = (matches(self._exclude, entry.name, rel_path)
+                or (self.exclude_paths and os.path.normcase(entry.path) in self.exclude_paths)
+                or (root_dev is not None and not same_device(entry, root_dev)))
+        if skip:
+            self.pruned_dirs += 1
+        return skip
+
+    def skip_file(self, entry, rel_path):
+        # Everything that can be decided before the file is stat'ed
+        skip = self._skip_name(entry.name, rel_path, entry.is_symlink)
+        if skip:
+            self.skipped_files += 1
+        return skip
+
+    def _skip_name(self, name, rel_path, is_symlink):
+        ext = os.path.splitext(name)[1].lower()
+        return ((self.skip_symlinks and is_symlink())
+                or (self.extensions and ext not in self.extensions)
+                or ext in self.exclude_extensions
+                or matches(self._exclude, name, rel_path)
+                or (self.include and not matches(self._include, name, rel_path)))
+
+    def skip_folder(self, path, rel_path):
+        # The folder rules for one folder found outside the walk (e.g. by a watcher)
+        parts = rel_path.split("/")
+        return (any(matches(self._exclude, name, "/".join(parts[:i + 1])) for i, name in enumerate(parts))
+                or any(_is_within(os.path.normcase(path), excluded) for excluded in self.exclude_paths))
+
+    def skip_path(self, path, rel_path, st, root_dev=None):
+        # The folder and file rules for one file found outside the walk
+        folder_rel_path = rel_path.rpartition("/")[0]
+        return ((folder_rel_path and self.skip_folder(os.path.dirname(path), folder_rel_path))
+                or (root_dev is not None and st.st_dev != root_dev)
+                or self._skip_name(rel_path.rpartition("/")[2], rel_path, lambda: os.path.islink(path))
+                or st.st_size < self.min_size or (self.max_size is not None and st.st_size > self.max_size))
+
+    def skip_size(self, size):
+        skip = size < self.min_size or (self.max_size is not None and size > self.max_size)
+        if skip:
+            self.skipped_files += 1
+        return skip
+
+def same_device(entry, root_dev):
+    try:
+        return entry.stat(follow_symlinks=False).st_dev == root_dev
+    except OSError:
+        return False
+
+def normalize_extension(ext):
+    ext = ext.strip().lower()
+    return ext if ext.startswith(".") else "." + ext
+
+def compile_patterns(patterns):
+    # Returns (name regexes, path regexes, "re:" regexes)
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    names, paths, regexes = [], [], []
+    for pattern in patterns:
+        if pattern.startswith("re:"):
+            regexes.append(re.compile(pattern[3:], flags))
+        elif "/" in pattern:
+            paths.append(re.compile(fnmatch.translate(pattern.strip("/")), flags))
+        else:
+            names.append(re.compile(fnmatch.translate(pattern), flags))
+    return names, paths, regexes
+
+def matches(compiled, name, rel_path):
+    names, paths, regexes = compiled
+    return (any(p.match(name) for p in names) or any(p.match(rel_path) for p in paths)
+            or any(p.search(rel_path) for p in regexes))
+
+# --- Streaming directory scanner ---
+def scan_directory(directory, rules=None, on_dir=None):
+    # Single os.scandir pass in os.walk order, reusing each DirEntry's cached stat data.
+    # Yields (path, stat_result) for regular files and (path, None) when stat fails.
+    # on_dir(path) is called for each folder before it is read.
+    prefix = directory.rstrip(os.sep) + os.sep
+    root_dev = os.stat(directory).st_dev if rules and rules.one_filesystem else None
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        if on_dir:
+            on_dir(current)
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        # Rules see the path below the root with "/" separators
+                        rel_path = entry.path[len(prefix):].replace(os.sep, "/") if rules else None
+                        if entry.is_dir():
+                            if entry.is_symlink() or (rules and rules.skip_dir(entry, rel_path, root_dev)):
+                                continue
+                            subdirs.append(entry.path)
+                            continue
+                        if rules and rules.skip_file(entry, rel_path):
+                            continue
+                        st = entry.stat()
+                    except OSError as e:
+                        logging.warning(f"Cannot stat file {entry.path}: {e}")
+                        yield entry.path, None
+                        continue
+                    if stat.S_ISREG(st.st_mode) and not (rules and rules.skip_size(st.st_size)):
+                        yield entry.path, st
+        except OSError as e:
+            logging.warning(f"Cannot read folder {current}: {e}")
+            continue
+        stack.extend(reversed(subdirs))
+
+# --- Multiple roots ---
+def _is_within(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+def normalize_roots(directory):
+    # Accepts one folder or a list. Returns absolute roots in the given order, dropping
+    # repeats and roots nested in another one (compared symlink-free) so no file is seen twice.
+    roots = [directory] if isinstance(directory, (str, os.PathLike)) else list(directory)
+    result = {}
+    for root in roots:
+        real = os.path.realpath(root)
+        if any(_is_within(real, kept) for kept in result.values()):
+            continue
+        result = {path: kept for path, kept in result.items() if not _is_within(kept, real)}
+        result[os.path.abspath(root)] = real
+    return list(result)
+
+def scan_roots(roots, rules=None, on_dir=None):
+    # Roots are walked in order, so files under the first root are found (and kept) first
+    for root in roots:
+        yield from scan_directory(root, rules, on_dir)
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+
+from .hashing import cancel_event, hash_algorithm_name
+from .logs import setup_logging, flush_logging
+
+try:
+    import zstandard  # optional - enables zstd compressed blobs
+except ImportError:
+    zstandard = None
+
+# Content-addressed backup store: every distinct content is kept once as
+# blobs/<algorithm>/<ab>/<cd>/<digest>[.zz|.zst] inside the backup folder, and manifest.jsonl
+# maps each removed file to its blob, so the backup grows with unique content, not with
+# duplicates. Blobs are named by the run's hash algorithm, one folder per algorithm, so runs
+# with different algorithms never give one content two names in the same folder.
+STORE_BLOBS_DIR = "blobs"
+STORE_MANIFEST_FILE = "manifest.jsonl"
+STORE_COMPRESSIONS = ("none", "zlib", "zstd")
+BLOB_EXTENSIONS = {"none": "", "zlib": ".zz", "zstd": ".zst"}
+STORE_CHUNK_SIZE = 1024 * 1024
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# --- Compression ---
+def _compressor(compression):
+    if compression == "zlib":
+        return zlib.compressobj(ZLIB_LEVEL)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return None
+
+def _decompressor(compression):
+    if compression == "zlib":
+        return zlib.decompressobj()
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard module is needed to restore .zst blobs")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+def blob_compression(blob):
+    for compression, ext in BLOB_EXTENSIONS.items():
+        if ext and blob.endswith(ext):
+            return compression
+    return "none"
+
+# --- Backup store ---
+class BackupStore:
+    # hash_func names the blobs: digests passed to put() must come from it, and files passed
+    # without one (matched by byte comparison) are hashed with it
+    def __init__(self, backup_dir, compression="none", hash_func=None):
+        if compression not in STORE_COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logging.warning("zstandard module is not installed, falling back to zlib.")
+            compression = "zlib"
+        self.backup_dir = backup_dir
+        self.compression = compression
+        self.hash_func = hash_func or hashlib.sha256
+        self.blobs_dir = os.path.join(backup_dir, STORE_BLOBS_DIR, hash_algorithm_name(self.hash_func))
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        self.manifest = open(os.path.join(backup_dir, STORE_MANIFEST_FILE), "a", encoding="utf-8")
+        self.blobs_written, self.blobs_reused, self.bytes_written = 0, 0, 0
+
+    def _blob_path(self, digest, compression):
+        return os.path.join(self.blobs_dir, digest[:2], digest[2:4], digest + BLOB_EXTENSIONS[compression])
+
+    def _find_blob(self, digest):
+        # An existing blob for digest in any compression
+        for compression in (self.compression,) + STORE_COMPRESSIONS:
+            blob_path = self._blob_path(digest, compression)
+            if os.path.exists(blob_path):
+                return blob_path
+        return None
+
+    def _write_blob(self, path, digest):
+        # Copies path into a temporary blob, hashing it when the digest is unknown (files matched
+        # by comparison), and returns the final blob path
+        tmp_path = os.path.join(self.blobs_dir, f".{os.getpid()}.mirrorclean-tmp")
+        hasher = self.hash_func() if digest is None else None
+        compressor = _compressor(self.compression)
+        try:
+            with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+                while chunk := src.read(STORE_CHUNK_SIZE):
+                    if hasher:
+                        hasher.update(chunk)
+                    dst.write(compressor.compress(chunk) if compressor else chunk)
+                if compressor:
+                    dst.write(compressor.flush())
+            digest = digest or hasher.hexdigest()
+            blob_path = self._find_blob(digest)
+            if blob_path:
+                os.remove(tmp_path)
+                self.blobs_reused += 1
+                return blob_path
+            blob_path = self._blob_path(digest, self.compression)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self.bytes_written += os.path.getsize(tmp_path)
+            os.replace(tmp_path, blob_path)
+            self.blobs_written += 1
+            return blob_path
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _record(self, path, st, blob_path):
+        # ASCII-escaped JSON, so paths that are not valid UTF-8 round-trip
+        self.manifest.write(json.dumps({
+            "path": path,
+            "blob": os.path.relpath(blob_path, self.backup_dir).replace(os.sep, "/"),
+            "size": st.st_size,
+            "mode": st.st_mode & 0o7777,
+            "mtime_ns": st.st_mtime_ns,
+            "stored": time.time()
+        }) + "\n")
+        self.manifest.flush()
+
+    def put(self, path, digest=None):
+        # Stores path's content, records it in the manifest and removes path. Content already
+        # in the store is not read or written again. The manifest line is written before path
+        # goes away, so a crash leaves either the original or a restorable entry.
+        st = os.stat(path)
+        blob_path = self._find_blob(digest) if digest else None
+        if blob_path:
+            self.blobs_reused += 1
+        elif digest and self.compression == "none" and st.st_dev == os.stat(self.blobs_dir).st_dev:
+            # Uncompressed blobs on the same filesystem are a rename away
+            blob_path = self._blob_path(digest, "none")
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._record(path, st, blob_path)
+            os.replace(path, blob_path)
+            self.blobs_written += 1
+            self.bytes_written += st.st_size
+            return blob_path
+        else:
+            blob_path = self._write_blob(path, digest)
+        self._record(path, st, blob_path)
+        os.remove(path)
+        return blob_path
+
+    def close(self):
+        logging.info(f"Backup store: {self.blobs_written} blobs written ({self.bytes_written:,} bytes), "
+                     f"{self.blobs_reused} duplicates matched stored content.")
+        self.manifest.close()
+
+# --- Restore ---
+def read_manifest(backup_dir):
+    # Latest manifest entry per original path, in the order they were stored
+    entries = {}
+    with open(os.path.join(backup_dir, STORE_MANIFEST_FILE), encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries.pop(entry["path"], None)
+                entries[entry["path"]] = entry
+    return list(entries.values())
+
+def restore_file(backup_dir, entry):
+    path = entry["path"]
+    blob_path = os.path.join(backup_dir, *entry["blob"].split("/"))
+    decompressor = _decompressor(blob_compression(blob_path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.mirrorclean-tmp")
+    try:
+        with open(blob_path, "rb") as src, open(tmp_path, "wb") as dst:
+            while chunk := src.read(STORE_CHUNK_SIZE):
+                dst.write(decompressor.decompress(chunk) if decompressor else chunk)
+            if decompressor:
+                dst.write(decompressor.flush())
+        os.chmod(tmp_path, entry["mode"])
+        os.utime(tmp_path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def restore_backup(backup_dir, log_dir, prefixes=None, overwrite=False, progress_callback=None,
+                   log_handler=None):
+    # Recreates the stored files whose path starts with one of prefixes (all when None).
+    # Existing files are left alone unless overwrite. Returns (restored, skipped, failed).
+    setup_logging(log_dir, log_handler)
+    try:
+        return _restore(backup_dir, prefixes, overwrite, progress_callback)
+    finally:
+        flush_logging()
+
+def _restore(backup_dir, prefixes, overwrite, progress_callback):
+    entries = read_manifest(backup_dir)
+    if prefixes:
+        prefixes = [os.path.abspath(prefix) for prefix in prefixes]
+        entries = [entry for entry in entries
+                   if any(entry["path"] == prefix or entry["path"].startswith(prefix.rstrip(os.sep) + os.sep)
+                          for prefix in prefixes)]
+    restored, skipped, failed = 0, 0, 0
+    for done, entry in enumerate(entries, 1):
+        if cancel_event.is_set():
+            logging.warning("Restore cancelled by user.")
+            break
+        if not overwrite and os.path.lexists(entry["path"]):
+            logging.info(f"Exists, not restored: {entry['path']}")
+            skipped += 1
+        else:
+            try:
+                restore_file(backup_dir, entry)
+                logging.info(f"Restored: {entry['path']}")
+                restored += 1
+            except Exception as e:
+                logging.error(f"Cannot restore {entry['path']}: {e}")
+                failed += 1
+        if progress_callback:
+            progress_callback(done, len(entries))
+    logging.info(f"Restore: {restored} files restored, {skipped} already present, {failed} failed.")
+    return restored, skipped, failed
@@ -0,0 +1,400 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import ctypes
+import ctypes.util
+
+from .hashing import DEFAULT_READ_MODE, cancel_event, hash_algorithm_name, get_file_hash, compare_files
+from .cache import HASH_CACHE_FILE, HashCache
+from .actions import ACTION_MODES, DEFAULT_ACTION
+from .scanner import ScanRules, normalize_roots, scan_directory, scan_roots
+from .engine import common_root, act_on_duplicate
+from .store import BackupStore
+from .logs import setup_logging, flush_logging, open_journal
+
+# A file is handled once it has not changed for WATCH_SETTLE_SECONDS, so half-written files
+# are never hashed. Without inotify the folders are re-walked every WATCH_POLL_SECONDS.
+WATCH_SETTLE_SECONDS = 2.0
+WATCH_POLL_SECONDS = 10.0
+WATCH_MODES = ("auto", "inotify", "poll")
+WATCH_COMPARE_MODES = ("hash", "exact")
+CACHE_FLUSH_SECONDS = 30
+
+# From linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+EVENT_HEADER = struct.Struct("iIII")
+EVENT_BUFFER_SIZE = 64 * 1024
+
+# --- inotify through ctypes ---
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+_libc = _load_libc()
+
+def inotify_available():
+    return _libc is not None
+
+class Inotify:
+    # Watches every folder of a tree; read_events() yields (path, mask). New folders must be
+    # added with add_watch() by the caller, inotify itself is not recursive.
+    def __init__(self):
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.folders = {}  # watch descriptor -> folder
+
+    def add_watch(self, folder):
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), folder)
+        self.folders[wd] = folder
+
+    def read_events(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return
+        try:
+            data = os.read(self.fd, EVENT_BUFFER_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                yield None, mask
+                continue
+            folder = self.folders.get(wd)
+            if mask & IN_IGNORED:
+                self.folders.pop(wd, None)
+                continue
+            if folder is not None:
+                yield (os.path.join(folder, os.fsdecode(name)) if name else folder), mask
+
+    def close(self):
+        os.close(self.fd)
+
+# --- Watcher ---
+class Watcher:
+    # Keeps every known file by size, and hashes a new file only when it shares its size with a
+    # known one. Digests come from the persistent hash cache, so files already hashed by earlier
+    # scans are not read again. The file found first stays, as in a full scan.
+    def __init__(self, roots, backup_dir, log_dir, hash_func, journal, preserve_structure=False,
+                 action=DEFAULT_ACTION, dry_run=False, include_empty=False, compare_mode="hash",
+                 scan_rules=None, store_compression="none", settle=WATCH_SETTLE_SECONDS,
+                 read_mode=DEFAULT_READ_MODE):
+        self.roots = roots
+        self.directory = common_root(roots) or roots[0]
+        self.backup_dir = backup_dir
+        self.hash_func = hash_func
+        self.journal = journal
+        self.algorithm = hash_algorithm_name(hash_func)
+        self.preserve_structure = preserve_structure and common_root(roots) is not None
+        self.action = action
+        self.dry_run = dry_run
+        self.include_empty = include_empty
+        self.compare_mode = compare_mode
+        self.rules = (scan_rules or ScanRules()).excluding(backup_dir, log_dir)
+        self.settle = settle
+        self.read_mode = read_mode
+        self.cache = HashCache(os.path.join(log_dir, HASH_CACHE_FILE))
+        self.store = (BackupStore(backup_dir, store_compression, hash_func)
+                      if action == "store" and not dry_run else None)
+        self.files = {}     # path -> (size, mtime_ns)
+        self.by_size = {}   # size -> [paths in the order found]
+        self.pending = {}   # path -> time it is due to be checked
+        self.settling = {}  # recently written pending files: path -> (size, mtime_ns) at the last check
+        self.resolved = {}  # duplicates acted on or reported: path -> (size, mtime_ns) left behind
+        self.root_devs = {root: os.stat(root).st_dev for root in roots} if self.rules.one_filesystem else {}
+        self.duplicates, self.skipped, self.handled = 0, 0, 0
+
+    # --- Index ---
+    def add_known(self, path, st):
+        self.files[path] = (st.st_size, st.st_mtime_ns)
+        self.by_size.setdefault(st.st_size, []).append(path)
+
+    def forget(self, path):
+        self.resolved.pop(path, None)
+        known = self.files.pop(path, None)
+        if known is None:
+            return
+        paths = self.by_size.get(known[0])
+        if paths:
+            paths.remove(path)
+            if not paths:
+                del self.by_size[known[0]]
+
+    def forget_folder(self, folder):
+        prefix = folder.rstrip(os.sep) + os.sep
+        for path in [path for path in self.files if path.startswith(prefix)]:
+            self.forget(path)
+        for path in [path for path in self.resolved if path.startswith(prefix)]:
+            del self.resolved[path]
+        for path in [path for path in self.pending if path.startswith(prefix)]:
+            del self.pending[path]
+            self.settling.pop(path, None)
+
+    def load(self, on_dir=None):
+        # Initial walk: stat only, nothing is hashed
+        for path, st in scan_roots(self.roots, self.rules, on_dir):
+            if st is not None and (st.st_size or self.include_empty):
+                self.add_known(path, st)
+        logging.info(f"Watching {len(self.files):,} files in {', '.join(self.roots)}.")
+
+    # --- New and changed files ---
+    def touch(self, path, now=None):
+        self.pending[path] = (now or time.monotonic()) + self.settle
+
+    def next_due(self):
+        return min(self.pending.values()) if self.pending else None
+
+    def process_due(self, now=None):
+        now = now or time.monotonic()
+        for path in [path for path, due in self.pending.items() if due <= now]:
+            del self.pending[path]
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                self.settling.pop(path, None)
+                self.forget(path)
+                continue
+            # Written to within the settle time (e.g. seen by polling), or dated in the future
+            # (clock skew, cp -p): look again later, and go on once it stayed the same that long
+            signature = (st.st_size, st.st_mtime_ns)
+            if time.time() - st.st_mtime < self.settle and self.settling.get(path) != signature:
+                self.settling[path] = signature
+                self.pending[path] = now + self.settle
+                continue
+            self.settling.pop(path, None)
+            self.handle(path, st)
+
+    def _root_of(self, path):
+        for root in self.roots:
+            if path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def _rel_path(self, root, path):
+        return path[len(root.rstrip(os.sep)) + 1:].replace(os.sep, "/")
+
+    def _digest(self, path, st):
+        digest = self.cache.get(st, self.algorithm, "full")
+        if digest is None:
+            digest = get_file_hash(path, self.hash_func, self.read_mode)
+            if digest:
+                self.cache.put(path, st, self.algorithm, "full", digest)
+        return digest
+
+    def _is_current(self, path, st):
+        # Known unchanged, or what an earlier action left behind (a link, a reflinked copy)
+        signature = (st.st_size, st.st_mtime_ns)
+        return self.files.get(path) == signature or self.resolved.get(path) == signature
+
+    def handle(self, path, st):
+        if not os.path.isfile(path) or self._is_current(path, st):
+            return
+        root = self._root_of(path)
+        if root is None:
+            return
+        rel_path = self._rel_path(root, path)
+        if self.rules.skip_path(path, rel_path, st, self.root_devs.get(root)):
+            return
+        self.forget(path)
+        if st.st_size == 0 and not self.include_empty:
+            return
+        self.handled += 1
+        candidates = list(self.by_size.get(st.st_size, ()))
+        if not candidates:
+            self.add_known(path, st)
+            return
+        digest = self._digest(path, st)
+        if digest is None:
+            self.skipped += 1
+            return
+        for kept_path in candidates:
+            try:
+                kept_st = os.stat(kept_path)
+            except OSError:
+                self.forget(kept_path)
+                continue
+            if (kept_st.st_dev, kept_st.st_ino) == (st.st_dev, st.st_ino):
+                continue
+            if self._digest(kept_path, kept_st) != digest:
+                continue
+            if self.compare_mode == "exact" and not compare_files(kept_path, path):
+                logging.warning(f"Digest matches but content differs: {path} ≠ {kept_path}. Skipped.")
+                continue
+            self.act(path, st, digest, kept_path)
+            return
+        self.add_known(path, st)
+
+    def act(self, path, st, digest, kept_path):
+        if self.dry_run:
+            logging.info(f"Duplicate found: {path} = {kept_path}")
+            self.journal.record("found", path, st.st_size, digest, kept_path)
+            self.duplicates += 1
+            self.resolved[path] = (st.st_size, st.st_mtime_ns)
+            return
+        outcome = act_on_duplicate(self.action, path, st.st_size, digest, kept_path, self.directory,
+                                   self.backup_dir, self.preserve_structure, self.journal, self.store)
+        if outcome == "ok":
+            self.duplicates += 1
+            # Links and reflinked copies stay at path, and replacing it fires another event
+            try:
+                left = os.stat(path, follow_symlinks=False)
+                self.resolved[path] = (left.st_size, left.st_mtime_ns)
+            except OSError:
+                pass
+        elif outcome == "skipped":
+            self.skipped += 1
+            # Still there, so later copies can match it
+            self.add_known(path, st)
+
+    # --- Event sources ---
+    def add_folder(self, folder, inotify):
+        # Watches a new folder and queues what it already holds, unless the rules exclude it
+        root = self._root_of(folder)
+        if root is None or self.rules.skip_folder(folder, self._rel_path(root, folder)):
+            return
+
+        def watch(path):
+            try:
+                inotify.add_watch(path)
+            except OSError as e:
+                logging.warning(f"Cannot watch {path}: {e.strerror}. New files there are found by rescans only.")
+
+        for path, st in scan_directory(folder, self.rules, watch):
+            if st is not None:
+                self.touch(path)
+
+    def on_event(self, path, mask, inotify):
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_folder(path, inotify)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.forget_folder(path)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self.forget(path)
+            self.pending.pop(path, None)
+            self.settling.pop(path, None)
+        elif mask & (IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO):
+            self.touch(path)
+
+    def rescan(self):
+        # Queues every file that is new or changed since it was last seen, forgets vanished ones
+        seen = set()
+        for path, st in scan_roots(self.roots, self.rules):
+            if st is None:
+                continue
+            seen.add(path)
+            if not self._is_current(path, st) and path not in self.pending:
+                self.touch(path)
+        for path in [path for path in self.files if path not in seen]:
+            self.forget(path)
+        for path in [path for path in self.resolved if path not in seen]:
+            del self.resolved[path]
+
+    def run(self, mode="auto", poll_interval=WATCH_POLL_SECONDS):
+        inotify = None
+        if mode != "poll" and inotify_available():
+            try:
+                inotify = Inotify()
+                self.load(inotify.add_watch)
+            except OSError as e:
+                # Usually fs.inotify.max_user_watches is too low for the tree
+                logging.warning(f"Cannot watch with inotify ({e.strerror}), polling every {poll_interval:g} s instead.")
+                if inotify:
+                    inotify.close()
+                    inotify = None
+                self.files, self.by_size = {}, {}
+                if mode == "inotify":
+                    raise
+        elif mode == "inotify":
+            raise OSError(errno.ENOSYS, "inotify is not available on this system")
+        if inotify is None:
+            self.load()
+            logging.info(f"Polling every {poll_interval:g} s.")
+
+        last_poll = last_flush = time.monotonic()
+        try:
+            while not cancel_event.is_set():
+                now = time.monotonic()
+                due = self.next_due()
+                timeout = 1.0 if due is None else min(1.0, max(0.0, due - now))
+                if inotify:
+                    for path, mask in inotify.read_events(timeout):
+                        if path is None:
+                            logging.warning("inotify queue overflowed, rescanning.")
+                            self.rescan()
+                        elif mask & IN_DELETE_SELF and path in self.roots:
+                            logging.warning(f"Watched folder removed: {path}")
+                        else:
+                            self.on_event(path, mask, inotify)
+                else:
+                    time.sleep(timeout)
+                    if now - last_poll >= poll_interval:
+                        self.rescan()
+                        last_poll = now
+                self.process_due()
+                if now - last_flush >= CACHE_FLUSH_SECONDS:
+                    self.cache.flush()
+                    self.journal.flush()
+                    last_flush = now
+        finally:
+            if inotify:
+                inotify.close()
+            self.close()
+
+    def close(self):
+        if self.store:
+            self.store.close()
+        self.cache.close()
+        self.journal.close()
+
+def watch_folders(directory, backup_dir, log_dir, hash_func, preserve_structure=False,
+                  log_handler=None, mode="auto", poll_interval=WATCH_POLL_SECONDS, **options):
+    # Runs until cancel_event is set. options are Watcher's. Returns (duplicates, skipped, handled).
+    if options.get("action", DEFAULT_ACTION) not in ACTION_MODES:
+        raise ValueError(f"Unknown action: {options['action']}")
+    if options.get("compare_mode", "hash") not in WATCH_COMPARE_MODES:
+        raise ValueError(f"Unknown compare mode: {options['compare_mode']}")
+    log_file = setup_logging(log_dir, log_handler)
+    roots = normalize_roots(directory)
+    if options.get("action", DEFAULT_ACTION) in ("copy", "move") and not os.path.exists(backup_dir):
+        os.makedirs(backup_dir)
+    watcher = Watcher(roots, backup_dir, log_dir, hash_func, open_journal(log_dir, log_file),
+                      preserve_structure, **options)
+    try:
+        watcher.run(mode, poll_interval)
+    finally:
+        logging.info(f"Watch stopped: {watcher.handled} new files checked, {watcher.duplicates} duplicates "
+                     f"handled, {watcher.skipped} skipped.")
+        flush_logging()
+    return watcher.duplicates, watcher.skipped, watcher.handled